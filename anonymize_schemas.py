@@ -1,28 +1,70 @@
 import os
+import sys
 import json
 import argparse
+import multiprocessing as mp
+from collections import Counter
 from tqdm import tqdm
 
-from utils.sql import verify_sample
-from models.schema_anonymizer import SchemaAnonymizer
+from utils.sql import verify_queries, VERIFY_MODES
+from utils.dataset import dev_samples_by_db
+from models.schema_anonymizer import SchemaAnonymizer, RECREATE_MODES, BULK_LOAD_PROFILES
+from models.sql_cache import SQLParseCache
 from configs.paths import SPIDER_DATABASE_PATH, BIRD_DATABASE_PATH, KAGGLEDBQA_DATABASE_PATH
 
 """
 
     creates anonymized databases for each db_id
-    and stores them as new datasets in data/datasets/
+    and stores them as new datasets in data/datasets/,
+    --levels L1,L2,L3 builds several levels in one sweep over the original databases
 
 """
 
+# full per-database pipeline of all levels: mappings, databases, samples and their verification
+# returns per level {level: value} samples, failed queries and differing plans
+def anonymize_database(task):
+    dataset, levels, db, samples, mode, profile, plan_parity, verify, verify_timeout, verify_workers = task
+    try:
+        anons = SchemaAnonymizer(dataset=dataset, db_id=db, samples=samples).recreate_databases(levels, mode=mode, profile=profile)
+        with SQLParseCache() as sql_cache: # gold queries are parsed once for all levels
+            for anon in anons:
+                anon.save_mapping()
+                anon.recreate_samples(sql_cache=sql_cache)
+    except Exception as e:
+        return db, {}, {}, {}, {}, repr(e)
+
+    new_samples, failed, differing_plans = {}, {}, {}
+    timings = Counter()
+    for anon in anons:
+        new_samples[anon.level] = anon.dev_new
+        failed[anon.level] = [] # verification failures, index refers to the samples of this database
+        if verify != "none":
+            failed[anon.level] = verify_queries([sample["query"] for sample in anon.dev_new], anon.db_path_new, mode=verify, timeout=verify_timeout, workers=verify_workers)
+        differing_plans[anon.level] = anon.plan_parity() if plan_parity else [] # queries whose plan differs from the original database
+        timings.update(anon.timings)
+
+    return db, new_samples, failed, dict(timings), differing_plans, None
+
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
 
     parser.add_argument("--dataset", type=str, choices=["spider", "bird", "kaggledbqa"], default="spider")
     parser.add_argument("--level", type=str, choices=["L1", "L2", "L3"], default="L1")
+    parser.add_argument("--levels", type=str, default=None) # e.g. "L1,L2,L3", overrides --level
+    parser.add_argument("--workers", type=int, default=1) # databases processed in parallel
+    parser.add_argument("--mode", type=str, choices=RECREATE_MODES, default="copy") # "rename" clones the database file instead of copying rows
+    parser.add_argument("--profile", type=str, choices=list(BULK_LOAD_PROFILES), default="bulk") # connection settings of copy mode
+    parser.add_argument("--plan_parity", action="store_true") # compare EXPLAIN QUERY PLAN of original and anonymized gold queries
+    parser.add_argument("--verify", type=str, choices=[*VERIFY_MODES, "none"], default="full") # "compile" only prepares the gold queries
+    parser.add_argument("--verify_timeout", type=float, default=30) # seconds per query in full verification
+    parser.add_argument("--verify_workers", type=int, default=1) # queries of one database verified in parallel
     args = parser.parse_args()
 
     DATASET = args.dataset
-    ANON_LEVEL = args.level
+    ANON_LEVELS = args.levels.split(",") if args.levels else [args.level]
+    if any(level not in ["L1", "L2", "L3"] for level in ANON_LEVELS):
+        parser.error(f"invalid --levels: {args.levels}")
 
     # set database path
     if DATASET == "spider":
@@ -35,26 +77,79 @@ if __name__ == '__main__':
         raise ValueError("Unknown Dataset selected.")
 
 
-    print(f"Starting schema generation for {DATASET}.")
-    new_samples = []
-    for db in tqdm(databases):
-        anon = SchemaAnonymizer(dataset=DATASET, db_id=db)
-        mapping = anon.generate_mapping(level=ANON_LEVEL)
-        anon.save_mapping()
-        anon.recreate_database()
-        new_samples.extend(anon.recreate_samples())
-
-    print("Verifying new samples.")
-    for sample in tqdm(new_samples):
-        db_id = sample["db_id"]
-        db_path = f"data/datasets/{DATASET}_{ANON_LEVEL}/database/{db_id}/{db_id}.sqlite"
-        res = verify_sample(sql=sample["query"], db_path=db_path)
-
-        if not res:
-            print(f"Error executing: {db_id} -- {sample['query']}")
-
-
-    with open(anon.dev_path_new, "w", encoding="utf-8") as f:
-        json.dump(new_samples, f, indent=4)
-
+    print(f"Starting schema generation for {DATASET} ({', '.join(ANON_LEVELS)}).")
+    dev_samples = dev_samples_by_db(DATASET) # dev set is parsed once, workers only receive the samples of their database
+    tasks = [(DATASET, ANON_LEVELS, db, dev_samples.get(db, []), args.mode, args.profile, args.plan_parity, args.verify, args.verify_timeout, args.verify_workers) for db in databases]
 
+    if args.workers > 1:
+        pool = mp.Pool(args.workers)
+        results = pool.imap_unordered(anonymize_database, tasks)
+    else:
+        pool = None
+        results = map(anonymize_database, tasks)
+
+    # collect per database and level, report progress and failures as they come in
+    samples_by_db = {level: {} for level in ANON_LEVELS}
+    differing_plans = {level: {} for level in ANON_LEVELS}
+    failures = {level: [] for level in ANON_LEVELS}
+    errors = {}
+    timings = Counter()
+    for db, samples, failed, db_timings, db_differing_plans, error in tqdm(results, total=len(tasks)):
+        timings.update(db_timings)
+        if error:
+            errors[db] = error
+            tqdm.write(f"Failed to anonymize {db}: {error}")
+            continue
+        for level in ANON_LEVELS:
+            samples_by_db[level][db] = samples[level]
+            if db_differing_plans[level]:
+                differing_plans[level][db] = db_differing_plans[level]
+            for failure in failed[level]:
+                failures[level].append({"db_id": db, **failure})
+                tqdm.write(f"Error executing ({failure['error_type']}): {db} ({level}) -- {failure['query']}\n{failure['error']}")
+
+    if pool is not None:
+        pool.close()
+        pool.join()
+
+    # summed over databases and levels (cpu time of all workers, not wall time)
+    print(f"Database build ({args.mode}, {args.profile}): " + ", ".join(f"{phase} {seconds:.1f}s" for phase, seconds in timings.items()))
+
+    if args.plan_parity:
+        for level in ANON_LEVELS:
+            n_differing = sum(len(plans) for plans in differing_plans[level].values())
+            parity_path = f"data/datasets/{DATASET}_{level}/plan_parity.json"
+            os.makedirs(os.path.dirname(parity_path), exist_ok=True)
+            with open(parity_path, "w", encoding="utf-8") as f:
+                json.dump({db: differing_plans[level][db] for db in databases if db in differing_plans[level]}, f, indent=4)
+            print(f"{level}: {n_differing} gold queries with differing query plans in {len(differing_plans[level])} databases, report saved to {parity_path}")
+
+    if args.verify != "none":
+        db_order = {db: i for i, db in enumerate(databases)}
+        for level in ANON_LEVELS:
+            # same order as dev.json
+            level_failures = sorted(failures[level], key=lambda failure: (db_order[failure["db_id"]], failure["index"]))
+            n_queries = sum(len(samples) for samples in samples_by_db[level].values())
+            report_path = f"data/datasets/{DATASET}_{level}/verification.json"
+            os.makedirs(os.path.dirname(report_path), exist_ok=True)
+            with open(report_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "mode": args.verify,
+                    "queries": n_queries,
+                    "failed": len(level_failures),
+                    "error_types": dict(Counter(failure["error_type"] for failure in level_failures)),
+                    "failures": level_failures
+                }, f, indent=4)
+            print(f"{level}: {len(level_failures)} of {n_queries} gold queries failed verification ({args.verify}), report saved to {report_path}")
+
+    if errors:
+        print(f"{len(errors)} of {len(databases)} databases failed, dev.json not written: {', '.join(sorted(errors))}")
+        sys.exit(1)
+
+    for level in ANON_LEVELS:
+        # same sample order as a serial run regardless of worker completion order
+        new_samples = [sample for db in databases for sample in samples_by_db[level][db]]
+
+        dev_path_new = f"data/datasets/{DATASET}_{level}/dev.json"
+        with open(dev_path_new, "w", encoding="utf-8") as f:
+            json.dump(new_samples, f, indent=4)
@@ -0,0 +1,164 @@
+import os
+import sys
+import json
+import time
+import shutil
+import resource
+import sqlite3
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # repository root (script lives in benchmarks/)
+sys.path.insert(0, ROOT)
+
+from configs.paths import RESULTS_PATH
+
+"""
+
+    bounded-memory check of SchemaAnonymizer.copy_data (engine and streamed copy)
+    builds a small and a large (default ~2 GB) synthetic database in a temporary directory,
+    copies each in a fresh interpreter and fails if the peak RSS of the large copy exceeds
+    the small one by more than the SQLite page cache of the profile plus --slack_mb,
+    run from the repository root:
+
+        python benchmarks/copy_memory.py --rows 2000000 --row_bytes 1000
+
+    exits 1 if memory grows with the table size
+
+"""
+
+SMALL_ROWS = 10000
+INVALID_EVERY = 1000 # every n-th note is Latin-1 (invalid UTF-8), decoded like the original copy
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1e6 if sys.platform == "darwin" else rss / 1e3 # bytes on macOS, KB on Linux
+
+# synthetic spider-style database (database file + schema json) below workdir
+def build_database(workdir: str, db_id: str, rows: int, row_bytes: int):
+    from models.schema_builder import SchemaBuilder
+
+    db_dir = os.path.join(workdir, "data", "datasets", "spider", "database", db_id)
+    os.makedirs(db_dir, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(db_dir, f"{db_id}.sqlite"))
+    conn.execute("PRAGMA journal_mode = OFF;")
+    conn.execute("PRAGMA synchronous = OFF;")
+    conn.execute("CREATE TABLE events (event_id INTEGER PRIMARY KEY, payload TEXT, note TEXT, amount REAL);")
+
+    payload = "x" * row_bytes
+    def generate():
+        for i in range(rows):
+            note = b"caf\xe9" if i % INVALID_EVERY == 0 else b"ok"
+            yield (i, payload, note, i * 0.5)
+    conn.executemany("INSERT INTO events VALUES (?, ?, CAST(? AS TEXT), ?);", generate())
+    conn.commit()
+    conn.close()
+
+    cwd = os.getcwd()
+    os.chdir(workdir) # SchemaBuilder and SchemaAnonymizer use paths relative to the repository layout
+    try:
+        with SchemaBuilder(dataset="spider", db_id=db_id, level="L0") as sb:
+            sb.build_schema_object()
+            sb.save_schema_json()
+    finally:
+        os.chdir(cwd)
+
+# copy one database in a fresh interpreter, returns its peak RSS and duration
+def measure_copy(workdir: str, db_id: str, engine: bool, chunk_size: int, profile: str) -> dict:
+    cmd = [
+        sys.executable, os.path.abspath(__file__), "--child", workdir, "--db_id", db_id,
+        "--chunk_size", str(chunk_size), "--profile", profile
+    ]
+    if not engine:
+        cmd.append("--stream")
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip())
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+# child process: anonymize and copy db_id below workdir, print json stats
+def run_copy(workdir: str, db_id: str, engine: bool, chunk_size: int, profile: str):
+    from models.schema_anonymizer import SchemaAnonymizer, BULK_LOAD_PROFILES
+
+    os.chdir(workdir)
+    anon = SchemaAnonymizer(dataset="spider", db_id=db_id, samples=[])
+    anon.generate_mapping(level="L1")
+    anon.profile = BULK_LOAD_PROFILES[profile]
+    anon.sql_create_statements()
+    anon.create_new_sqlite_db()
+
+    rss_before = peak_rss_mb()
+    start_time = time.perf_counter()
+    anon.copy_data(engine=engine, chunk_size=chunk_size)
+    seconds = time.perf_counter() - start_time
+
+    conn = sqlite3.connect(anon.db_path_new)
+    rows = conn.execute(f'SELECT count(*) FROM "{anon.mapping["events"]}";').fetchone()[0]
+    conn.close()
+    print(json.dumps({"rows": rows, "seconds": seconds, "rss_before_mb": rss_before, "peak_rss_mb": peak_rss_mb()}))
+
+# SQLite page cache a profile may fill (cache_size < 0: KiB, otherwise pages)
+def cache_mb(profile: str) -> float:
+    from models.schema_anonymizer import BULK_LOAD_PROFILES
+
+    p = BULK_LOAD_PROFILES[profile]
+    cache_bytes = -p.cache_size * 1024 if p.cache_size < 0 else p.cache_size * p.page_size
+    return cache_bytes / 1e6
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--rows", type=int, default=2000000) # rows of the large table
+    parser.add_argument("--row_bytes", type=int, default=1000) # payload per row (default ~2 GB table)
+    parser.add_argument("--chunk_size", type=int, default=10000) # rows per chunk of the streamed copy
+    parser.add_argument("--profile", type=str, default="bulk")
+    parser.add_argument("--modes", type=str, nargs="+", choices=["engine", "stream"], default=["engine", "stream"])
+    parser.add_argument("--slack_mb", type=float, default=64) # allowed growth on top of the page cache
+    parser.add_argument("--workdir", type=str, default=None) # temporary directory otherwise (removed afterwards)
+    parser.add_argument("--out", type=str, default=f"{RESULTS_PATH}copy_memory.json")
+    parser.add_argument("--child", type=str, default=None) # internal: workdir of a single measured copy
+    parser.add_argument("--db_id", type=str, default=None) # internal
+    parser.add_argument("--stream", action="store_true") # internal
+    args = parser.parse_args()
+
+    if args.child:
+        run_copy(args.child, args.db_id, not args.stream, args.chunk_size, args.profile)
+        sys.exit(0)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="copy_memory_")
+    try:
+        print(f"Building synthetic databases in {workdir} ({args.rows} rows x {args.row_bytes} bytes)")
+        build_database(workdir, "copy_memory_small", SMALL_ROWS, args.row_bytes)
+        build_database(workdir, "copy_memory_large", args.rows, args.row_bytes)
+
+        allowed_mb = cache_mb(args.profile) + args.slack_mb
+        report = {"rows": args.rows, "row_bytes": args.row_bytes, "profile": args.profile, "allowed_growth_mb": allowed_mb}
+        failures = []
+        for mode in args.modes:
+            small = measure_copy(workdir, "copy_memory_small", mode == "engine", args.chunk_size, args.profile)
+            large = measure_copy(workdir, "copy_memory_large", mode == "engine", args.chunk_size, args.profile)
+            growth = large["peak_rss_mb"] - small["peak_rss_mb"]
+            report[mode] = {"small": small, "large": large, "growth_mb": growth}
+
+            ok = growth <= allowed_mb and large["rows"] == args.rows
+            if not ok:
+                failures.append(mode)
+            print(
+                f"{mode:<7} | small {small['peak_rss_mb']:.0f} MB | large {large['peak_rss_mb']:.0f} MB "
+                f"({large['rows'] / max(large['seconds'], 1e-9):.0f} rows/s) | growth {growth:.0f} MB "
+                f"(allowed {allowed_mb:.0f} MB) | {'ok' if ok else 'FAIL'}"
+            )
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print(f"✅ Report saved to {args.out}")
+
+    if failures:
+        print(f"Peak memory grows with the table size: {', '.join(failures)}")
+        sys.exit(1)
@@ -0,0 +1,108 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+from statistics import median
+
+"""
+
+    import-time check (python -X importtime) of the package modules
+    and entry scripts, run from the repository root:
+
+        python benchmarks/import_time.py
+
+    fails if a module pulls in a heavy dependency at import time (sys.modules),
+    import times are only reported, absolute timings differ between hosts
+    (tests/test_import_time.py asserts the same per module)
+
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # repository root (script lives in benchmarks/)
+
+# heavy dependencies must only be loaded on first use
+HEAVY_MODULES = ["faiss", "fasttext", "sqlglot", "sqlparse", "nltk", "openai", "func_timeout"]
+
+MODULES = [
+    "utils.ambiguity",
+    "utils.sql",
+    "utils.dataset",
+    "models.faiss_index",
+    "models.sas",
+    "models.sas_service",
+    "models.sas_store",
+    "models.token_cache",
+    "models.subword_embedding",
+    "models.schema_anonymizer",
+    "models.sql_cache",
+    "models.sql_rewriter",
+    "models.schema_builder",
+    "models.evaluator",
+    "models.llm",
+    "models.prompt",
+    "models.schema_linker",
+    "models.demonstrations",
+    "calculate_sas",
+    "token_level_scaling",
+    "build_index",
+    "evaluate_index",
+    "sas_server",
+    "anonymize_schemas",
+    "build_schemas",
+    "evaluate_results",
+    "prompt_model",
+    "build_demonstrations",
+    "export_embeddings",
+]
+
+# import one module in a fresh interpreter, return cumulative import time (ms) and loaded heavy modules
+def measure_import(module: str):
+    code = f"import sys, json, {module}; print(json.dumps(sorted(sys.modules)))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, cwd=ROOT)
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "unknown error"
+        return None, [], error
+
+    # lines look like "import time: self [us] | cumulative | imported package"
+    cumulative_us = None
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if line.startswith("import time:") and len(parts) == 3 and parts[2].strip() == module:
+            cumulative_us = int(parts[1])
+
+    loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+    heavy = [m for m in HEAVY_MODULES if m in loaded]
+    return cumulative_us / 1000 if cumulative_us is not None else None, heavy, None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--modules", type=str, nargs="+", default=MODULES)
+    parser.add_argument("--repeats", type=int, default=5) # median over fresh interpreters
+    args = parser.parse_args()
+
+    failures = []
+    for module in args.modules:
+        times = []
+        for _ in range(args.repeats):
+            ms, heavy, error = measure_import(module)
+            if error:
+                break
+            times.append(ms)
+
+        if error:
+            # missing optional dependencies of the environment are reported, not failed
+            print(f"{module:<28} skipped ({error})")
+            continue
+
+        status = "ok"
+        if heavy:
+            status = f"FAIL heavy imports: {', '.join(heavy)}"
+            failures.append(module)
+
+        print(f"{module:<28} {median(times):8.1f} ms  {status}")
+
+    if failures:
+        print(f"Heavy imports at import time in {len(failures)} module(s): {', '.join(failures)}")
+        sys.exit(1)
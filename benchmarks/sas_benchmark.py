@@ -0,0 +1,227 @@
+import os
+import sys
+import json
+import time
+import random
+import resource
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # repository root (script lives in benchmarks/)
+
+from models.faiss_index import EmbeddingIndex
+from models.sas import SchemaAmbiguityScorer
+from utils.ambiguity import token_ambiguity, name_sas
+from utils.vocab import build_dictionary_from_fasttext, MIN_LEN, ALPHA_ONLY
+from utils.naming import analyze_name, tokenize_name
+from utils.policy import choose_operator
+from utils.operators import apply_operator
+from utils.abbr import COMMON_ABBREVS
+from configs.paths import RESULTS_PATH
+
+"""
+
+    offline SAS performance benchmark (no network, no cc.en.300.bin)
+    builds a synthetic subword embedding model and schemas of configurable size
+    and reports throughput, p50/p99 latency and peak RSS per stage as json,
+    run from the repository root (anchors are read from configs/):
+
+        python benchmarks/sas_benchmark.py --columns 10 1000 100000
+
+"""
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+CASE_STYLES = ["snake", "camel", "pascal", "upper", "lower"]
+LEVELS = ["L0", "L1", "L2", "L3"]
+
+
+class SyntheticEmbedding:
+    """
+    Small fastText-like embedding model
+    In-vocabulary words get their own vector, every word additionally
+    averages hashed character trigram vectors, so OOV tokens are embedded
+    close to similar-looking dictionary words (like fastText subwords).
+    """
+
+    def __init__(self, n_words: int = 20000, dim: int = 100, buckets: int = 50000, seed: int = 42):
+        rng = np.random.default_rng(seed)
+        real_words = sorted(set(COMMON_ABBREVS.keys()) | set(COMMON_ABBREVS.values()))
+        pseudo_words = {
+            "".join(rng.choice(list(LETTERS), size=rng.integers(3, 11)))
+            for _ in range(max(0, n_words - len(real_words)))
+        }
+
+        self.words = real_words + sorted(pseudo_words - set(real_words))
+        self.word_to_idx = {w: i for i, w in enumerate(self.words)}
+        self.dim = dim
+        self.buckets = buckets
+        self.word_matrix = rng.standard_normal((len(self.words), dim)).astype(np.float32)
+        self.ngram_matrix = rng.standard_normal((buckets, dim)).astype(np.float32)
+
+    def get_dimension(self) -> int:
+        return self.dim
+
+    def get_words(self):
+        return self.words
+
+    def get_word_vector(self, word: str) -> np.ndarray:
+        padded = f"<{word}>"
+        rows = [hash_ngram(padded[i:i + 3]) % self.buckets for i in range(len(padded) - 2)]
+        vec = self.ngram_matrix[rows].sum(axis=0)
+        n = len(rows)
+
+        idx = self.word_to_idx.get(word)
+        if idx is not None:
+            vec = vec + self.word_matrix[idx]
+            n += 1
+        return vec / max(n, 1)
+
+    def get_word_vectors(self, words) -> np.ndarray:
+        vectors = np.empty((len(words), self.dim), dtype=np.float32)
+        for i, word in enumerate(words):
+            vectors[i] = self.get_word_vector(word)
+        return vectors
+
+
+# stable (process independent) hash of a character n-gram
+def hash_ngram(ngram: str) -> int:
+    h = 2166136261
+    for b in ngram.encode("utf-8"):
+        h = ((h ^ b) * 16777619) & 0xFFFFFFFF
+    return h
+
+# join tokens in one of the naming styles found in real schemas
+def format_name(tokens, style: str) -> str:
+    if style == "snake":
+        return "_".join(tokens)
+    if style == "camel":
+        return tokens[0] + "".join(t.capitalize() for t in tokens[1:])
+    if style == "pascal":
+        return "".join(t.capitalize() for t in tokens)
+    if style == "upper":
+        return "_".join(tokens).upper()
+    return "".join(tokens)
+
+# random schema name, anonymized with the operators of the given level
+def generate_name(rng: random.Random, vocab, level: str) -> str:
+    tokens = rng.sample(vocab, rng.randint(1, 3))
+    name = format_name(tokens, rng.choice(CASE_STYLES))
+    if rng.random() < 0.1:
+        name = f"{name}_{rng.randint(1, 99)}" # numeric tokens
+
+    nf = analyze_name(name)
+    return apply_operator(choose_operator(level, nf), nf, level)
+
+# schema json (see SchemaBuilder) with n_columns columns in total
+def generate_schema(n_columns: int, vocab, seed: int, columns_per_table: int = 10) -> dict:
+    rng = random.Random(seed)
+    schema = {}
+    n_tables = max(1, n_columns // columns_per_table)
+    for t in range(n_tables):
+        level = rng.choice(LEVELS)
+        table_name = f"{generate_name(rng, vocab, level)}_{t}" # unique table names
+        n_cols = columns_per_table if t < n_tables - 1 else n_columns - columns_per_table * (n_tables - 1)
+        schema[table_name] = {
+            "columns": [{"name": generate_name(rng, vocab, level)} for _ in range(n_cols)],
+            "primary_keys": [],
+            "foreign_keys": []
+        }
+    return {"dataset": "synthetic", "db_id": f"synthetic_{n_columns}", "schema": schema}
+
+# peak resident set size of this process in MB
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1e6 if sys.platform == "darwin" else rss / 1e3 # bytes on macOS, KB on Linux
+
+# latency percentiles (ms) and throughput of per-item timings
+def latency_stats(durations, n_tokens: int) -> dict:
+    durations = np.asarray(durations)
+    total = float(durations.sum())
+    return {
+        "items": len(durations),
+        "tokens": n_tokens,
+        "tokens_per_s": n_tokens / max(total, 1e-9),
+        "p50_ms": float(np.percentile(durations, 50) * 1000),
+        "p99_ms": float(np.percentile(durations, 99) * 1000),
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+# time fn once, return (result, seconds)
+def timed(fn, *args, **kwargs):
+    start_time = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start_time
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--columns", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000]) # schema sizes
+    parser.add_argument("--words", type=int, default=20000) # synthetic vocabulary size
+    parser.add_argument("--dim", type=int, default=100)
+    parser.add_argument("--index_type", type=str, default="flat")
+    parser.add_argument("--samples", type=int, default=1000) # tokens / names for per-item latencies
+    parser.add_argument("--unbatched_max_columns", type=int, default=1000) # also time the per-name path up to this size
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", type=str, default=f"{RESULTS_PATH}sas_benchmark.json")
+    args = parser.parse_args()
+
+    report = {"config": vars(args), "stages": {}}
+    stages = report["stages"]
+
+    model, seconds = timed(SyntheticEmbedding, n_words=args.words, dim=args.dim, seed=args.seed)
+    stages["synthetic_model"] = {"seconds": seconds, "peak_rss_mb": peak_rss_mb()}
+
+    # dictionary and index construction
+    (dict_words, dict_vectors), seconds = timed(build_dictionary_from_fasttext, model, max_words=None, min_len=MIN_LEN, alpha_only=ALPHA_ONLY)
+    stages["build_dictionary"] = {"seconds": seconds, "words": len(dict_words), "words_per_s": len(dict_words) / max(seconds, 1e-9), "peak_rss_mb": peak_rss_mb()}
+
+    index, seconds = timed(EmbeddingIndex, dict_words, dict_vectors, index_type=args.index_type)
+    stages["build_index"] = {"seconds": seconds, "words": len(dict_words), "peak_rss_mb": peak_rss_mb()}
+
+    # per-item latencies on names drawn like schema names
+    vocab = dict_words[:5000]
+    rng = random.Random(args.seed)
+    names = [generate_name(rng, vocab, rng.choice(LEVELS)) for _ in range(args.samples)]
+    tokens = [token for name in names for token in tokenize_name(name)][:args.samples]
+
+    durations = [timed(token_ambiguity, token, model, index)[1] for token in tokens]
+    stages["token_ambiguity"] = latency_stats(durations, len(tokens))
+
+    durations = [timed(name_sas, name, tokenize_name, model, index)[1] for name in names]
+    stages["name_sas"] = latency_stats(durations, sum(len(tokenize_name(name)) for name in names))
+
+    # whole schemas of increasing size
+    batched = SchemaAmbiguityScorer(model, index, tokenize_name, batched=True)
+    unbatched = SchemaAmbiguityScorer(model, index, tokenize_name, batched=False)
+    stages["schema_sas"] = []
+    for n_columns in args.columns:
+        schema_json = generate_schema(n_columns, vocab, args.seed + n_columns)
+        all_names = list(schema_json["schema"]) + [col["name"] for table in schema_json["schema"].values() for col in table["columns"]]
+        n_tokens = sum(len(tokenize_name(name)) for name in all_names)
+
+        entry = {"columns": n_columns, "tables": len(schema_json["schema"]), "tokens": n_tokens}
+        for mode, scorer in (("batched", batched), ("unbatched", unbatched)):
+            if mode == "unbatched" and n_columns > args.unbatched_max_columns:
+                continue
+            result, seconds = timed(scorer.schema_sas, schema_json)
+            entry[mode] = {
+                "seconds": seconds,
+                "tokens_per_s": n_tokens / max(seconds, 1e-9),
+                "SAS_schema": result["SAS_schema"],
+                "peak_rss_mb": peak_rss_mb()
+            }
+        stages["schema_sas"].append(entry)
+
+        summary = " | ".join(f"{mode}: {entry[mode]['tokens_per_s']:.0f} tokens/s" for mode in ("batched", "unbatched") if mode in entry)
+        print(f"schema_sas {n_columns:>6} columns | {summary}")
+
+    print(f"token_ambiguity | {stages['token_ambiguity']['tokens_per_s']:.0f} tokens/s | p50 {stages['token_ambiguity']['p50_ms']:.3f} ms | p99 {stages['token_ambiguity']['p99_ms']:.3f} ms")
+    print(f"name_sas        | {stages['name_sas']['tokens_per_s']:.0f} tokens/s | p50 {stages['name_sas']['p50_ms']:.3f} ms | p99 {stages['name_sas']['p99_ms']:.3f} ms")
+    print(f"peak RSS: {peak_rss_mb():.1f} MB")
+
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+
+    print(f"✅ Benchmark report saved to {args.out}")
@@ -0,0 +1,112 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # repository root (script lives in benchmarks/)
+
+from models.schema_anonymizer import SchemaAnonymizer, translate_sql_ast
+from models.sql_rewriter import SQLRewriter
+from utils.dataset import DEV_PATHS, dev_samples_by_db
+from configs.paths import MAPPINGS_PATH, RESULTS_PATH
+
+"""
+
+    differential check of the token-stream SQL rewriter (models/sql_rewriter.py)
+    against the AST rewriting of SchemaAnonymizer.translate_sql on all gold queries,
+    outputs are compared after normalization (sqlglot, identify=True),
+    run from the repository root:
+
+        python benchmarks/sql_rewrite_check.py --datasets spider bird kaggledbqa
+
+    exits 1 if any rewritten query differs
+
+"""
+
+# mapping stored by anonymize_schemas.py, generated (deterministically) otherwise
+def load_mapping(dataset: str, level: str, db_id: str) -> dict:
+    path = f"{MAPPINGS_PATH}{dataset}_{level}/{db_id}.json"
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    anon = SchemaAnonymizer(dataset=dataset, db_id=db_id)
+    return anon.generate_mapping(level=level)
+
+# canonical form of a query, independent of quoting and formatting
+def normalize(sql: str) -> str:
+    import sqlglot
+    return sqlglot.parse_one(sql, read="sqlite").sql(dialect="sqlite", identify=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--datasets", type=str, nargs="+", choices=list(DEV_PATHS), default=list(DEV_PATHS))
+    parser.add_argument("--levels", type=str, nargs="+", choices=["L1", "L2", "L3"], default=["L1", "L2", "L3"])
+    parser.add_argument("--out", type=str, default=f"{RESULTS_PATH}sql_rewrite_check.json")
+    args = parser.parse_args()
+
+    report = {}
+    n_mismatches = 0
+    for dataset in args.datasets:
+        if not os.path.exists(DEV_PATHS[dataset]):
+            print(f"{dataset:<12} skipped ({DEV_PATHS[dataset]} not found)")
+            continue
+
+        queries_by_db = {
+            db_id: [sample.get("SQL") or sample.get("query") for sample in samples]
+            for db_id, samples in dev_samples_by_db(dataset).items()
+        }
+
+        for level in args.levels:
+            stats = {"queries": 0, "unparsable": 0, "invalid_reference": 0, "fallbacks": 0, "mismatches": [], "ast_seconds": 0.0, "token_seconds": 0.0}
+
+            for db_id, sqls in queries_by_db.items():
+                mapping = load_mapping(dataset, level, db_id)
+                rewriter = SQLRewriter(mapping)
+
+                for sql in sqls:
+                    start_time = time.perf_counter()
+                    try:
+                        expected = translate_sql_ast(sql, mapping)
+                    except Exception:
+                        stats["unparsable"] += 1 # no reference to compare with
+                        continue
+                    stats["ast_seconds"] += time.perf_counter() - start_time
+
+                    start_time = time.perf_counter()
+                    rewritten = rewriter.rewrite(sql)
+                    stats["token_seconds"] += time.perf_counter() - start_time
+                    stats["queries"] += 1
+
+                    try:
+                        expected = normalize(expected)
+                    except Exception:
+                        stats["invalid_reference"] += 1 # AST rewriting produced invalid SQL (e.g. unquoted names with spaces)
+                        continue
+                    try:
+                        equal = normalize(rewritten) == expected
+                    except Exception:
+                        equal = False
+                    if not equal:
+                        stats["mismatches"].append({"db_id": db_id, "query": sql, "expected": expected, "rewritten": rewritten})
+
+                stats["fallbacks"] += rewriter.fallbacks
+
+            n_mismatches += len(stats["mismatches"])
+            report[f"{dataset}_{level}"] = stats
+            print(
+                f"{dataset:<12} {level} | {stats['queries']} queries | {len(stats['mismatches'])} mismatches | "
+                f"{stats['fallbacks']} AST fallbacks | AST {stats['queries'] / max(stats['ast_seconds'], 1e-9):.0f} q/s | "
+                f"tokens {stats['queries'] / max(stats['token_seconds'], 1e-9):.0f} q/s"
+            )
+
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print(f"✅ Report saved to {args.out}")
+
+    if n_mismatches:
+        print(f"{n_mismatches} rewritten queries differ from the AST rewriting")
+        sys.exit(1)
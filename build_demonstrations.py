@@ -0,0 +1,66 @@
+import json
+import argparse
+from tqdm import tqdm
+from collections import defaultdict
+
+from models.demonstrations import DemonstrationIndex, embed_questions
+from models.schema_anonymizer import SchemaAnonymizer
+from models.sql_cache import SQLParseCache
+from models.subword_embedding import load_embedding_model, embedding_fingerprint
+from configs.paths import SPIDER_TRAIN_PATH, DEMONSTRATION_ARTIFACT_PATH, EMBEDDING_ARTIFACT_PATH
+
+"""
+
+    one-time build of the few-shot demonstration index over train_spider.json:
+    embeds all training questions into a FAISS index and stores the
+    demonstration SQL of every anonymization level (via SchemaAnonymizer.translate_sql)
+    in configs.paths.DEMONSTRATION_ARTIFACT_PATH, used by prompt_model.py --few_shot
+
+"""
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--model", type=str, default="cc.en.300.bin")
+    parser.add_argument("--train", type=str, default=SPIDER_TRAIN_PATH)
+    parser.add_argument("--levels", type=str, nargs="+", choices=["L1", "L2", "L3"], default=["L1", "L2", "L3"])
+    parser.add_argument("--out", type=str, default=DEMONSTRATION_ARTIFACT_PATH)
+    args = parser.parse_args()
+
+    with open(args.train, "r") as f:
+        samples = json.load(f)
+
+    samples_by_db = defaultdict(list)
+    for sample in samples:
+        samples_by_db[sample["db_id"]].append(sample)
+
+    # translate demonstration SQL with the same deterministic mappings as anonymize_schemas.py
+    demonstrations = []
+    failed = 0
+    sql_cache = SQLParseCache() # every training query is parsed once for all levels
+    for db_id, db_samples in tqdm(samples_by_db.items()):
+        queries = [{"L0": sample["query"]} for sample in db_samples]
+        parsed = sql_cache.parse_many([sample["query"] for sample in db_samples], strict=False)
+
+        for level in args.levels:
+            anon = SchemaAnonymizer(dataset="spider", db_id=db_id, samples=db_samples) # fresh instance per level, like anonymize_schemas.py
+            anon.generate_mapping(level=level)
+            for parsed_query, query in zip(parsed, queries):
+                try:
+                    query[level] = parsed_query.translate(anon.mapping)
+                except Exception: # includes unparsable queries (None)
+                    query[level] = None # demonstration is skipped for this level
+                    failed += 1
+
+        for sample, query in zip(db_samples, queries):
+            demonstrations.append({"db_id": db_id, "question": sample["question"], "query": query})
+    sql_cache.close()
+
+    print(f"Translated {len(demonstrations)} demonstrations ({failed} failed translations).")
+
+    # embed all training questions at once
+    model = load_embedding_model(args.model, EMBEDDING_ARTIFACT_PATH)
+    vectors = embed_questions([demo["question"] for demo in demonstrations], model)
+
+    index = DemonstrationIndex(demonstrations, vectors)
+    index.save(args.out, meta={"model_fingerprint": embedding_fingerprint(model, args.model), "levels": ["L0", *args.levels]})
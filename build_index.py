@@ -0,0 +1,60 @@
+import json
+import argparse
+
+from models.faiss_index import EmbeddingIndex, INDEX_TYPES, dictionary_meta
+from models.subword_embedding import load_embedding_model, embedding_fingerprint
+from utils.vocab import build_dictionary_from_fasttext, MAX_WORDS, MIN_LEN, ALPHA_ONLY
+from configs.paths import ARTIFACTS_PATH, INDEX_ARTIFACT_PATH, EMBEDDING_ARTIFACT_PATH
+
+"""
+
+    one-time build of the dictionary and FAISS index artifacts
+    (normalized vectors, word list, index) in configs.paths.INDEX_ARTIFACT_PATH
+    which calculate_sas.py and token_level_scaling.py memory-map on startup
+
+"""
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--model", type=str, default="cc.en.300.bin")
+    parser.add_argument("--max_words", type=int, default=MAX_WORDS)
+    parser.add_argument("--min_len", type=int, default=MIN_LEN)
+    parser.add_argument("--alpha_only", type=int, choices=[0, 1], default=int(ALPHA_ONLY))
+    parser.add_argument("--index_type", type=str, choices=INDEX_TYPES, default="flat")
+    parser.add_argument("--index_params", type=str, default="{}") # json, e.g. '{"nlist": 4096, "nprobe": 32}' or '{"pca_dim": 128, "quantization": "int8"}'
+    parser.add_argument("--out", type=str, default=None)
+    args = parser.parse_args()
+
+    index_params = json.loads(args.index_params)
+    compression = {k: index_params[k] for k in ("pca_dim", "quantization") if index_params.get(k)}
+
+    # flat index is the default artifact, approximate / compressed ones live next to it
+    if args.out:
+        out_path = args.out
+    elif args.index_type == "flat" and not compression:
+        out_path = INDEX_ARTIFACT_PATH
+    else:
+        suffix = "".join(f"_{k}{v}" for k, v in sorted(compression.items()))
+        out_path = f"{ARTIFACTS_PATH}dictionary_{args.index_type}{suffix}/"
+
+    # load exported embeddings (see export_embeddings.py) or the fastText model
+    model = load_embedding_model(args.model, EMBEDDING_ARTIFACT_PATH)
+
+    # build dictionary and FAISS index
+    dict_words, dict_vectors = build_dictionary_from_fasttext(
+        model,
+        max_words=args.max_words,
+        min_len=args.min_len,
+        alpha_only=bool(args.alpha_only)
+    )
+    index = EmbeddingIndex(
+        dict_words,
+        dict_vectors,
+        index_type=args.index_type,
+        index_params=index_params
+    )
+
+    # store artifacts together with what they were built from
+    meta = dictionary_meta(embedding_fingerprint(model, args.model), args.max_words, args.min_len, bool(args.alpha_only))
+    index.save(out_path, meta=meta)
@@ -1,71 +1,162 @@
 import os
+import csv
 import json
-import fasttext
+import argparse
+import multiprocessing as mp
 from statistics import mean
 
-from models.faiss_index import EmbeddingIndex
+from models.faiss_index import EmbeddingIndex, load_or_build_index
 from models.sas import SchemaAmbiguityScorer
-from utils.vocab import build_dictionary_from_fasttext
-from configs.paths import SCHEMAS_PATH
-from utils.naming import split_camel_and_underscores
-
-
-# load model
-model = fasttext.load_model("cc.en.300.bin")
-
-# build dictionary and FAISS index
-dict_words, dict_vectors = build_dictionary_from_fasttext(model)
-index = EmbeddingIndex(dict_words, dict_vectors)
-
-# use tokenizer function
-def my_tokenizer(name: str):
-    tokens = split_camel_and_underscores(name)
-    tokens = [token.lower() for token in tokens] # fastText embeddings are lowercase by default
-    return tokens
-
-# build scorer
-scorer = SchemaAmbiguityScorer(model, index, my_tokenizer)
-
-# set dataset variants
-levels = ["L0", "L1", "L2", "L3"]
-datasets = ["spider", "bird", "kaggledbqa"]
-
-results = {}
-
-# load schema JSON and compute SAS for each variant
-for dataset in datasets:
-    results[dataset] = {}
-    for level in levels:
-        results[dataset][level] = {}
-
-        # target dir
-        if level == "L0":
-            s_path = f"{SCHEMAS_PATH}{dataset}/"
-        else:
-            s_path = f"{SCHEMAS_PATH}{dataset}_{level}/"
-
-        for db_json in os.listdir(s_path):
-            with open(f"{s_path}{db_json}", "r") as f: 
-                schema_json = json.load(f)
-
-            # compute SAS
-            result = scorer.schema_sas(schema_json)
-            results[dataset][level][db_json] = result
-
-
-# beautify results dict
-final = {} 
-for dataset, levels in results.items():
-    for level, dbs in levels.items():
-        schemas = [
-            db_info["SAS_schema"]
-            for db_info in dbs.values() # each individual database
-        ]
-        avg_schema = mean(schemas)
-        final[(dataset, level)] = avg_schema
-
-
-# print final results
-for (dataset, level), avg in final.items():
-    print(f"{dataset} {level}: {avg:.4f}")
-
+from models.token_cache import TokenAmbiguityCache, token_cache_fingerprint
+from models.sas_store import SASResultStore, schema_hash, scorer_fingerprint
+from models.subword_embedding import load_embedding_model, embedding_fingerprint
+from utils.ambiguity import ANCHOR_PATH
+from configs.paths import SCHEMAS_PATH, SAS_PATH, INDEX_ARTIFACT_PATH, EMBEDDING_ARTIFACT_PATH
+from utils.naming import tokenize_name
+from utils.vocab import MAX_WORDS, MIN_LEN, ALPHA_ONLY
+
+"""
+
+    computes the SAS of every schema json of the selected dataset variants,
+    streams per-database results to data/sas/ and prints the mean per variant
+    only new or changed schemas are rescored, all others come from the result store
+
+"""
+
+MODEL_PATH = "cc.en.300.bin"
+CSV_FIELDS = ["dataset", "level", "db_id", "SAS_tables", "SAS_columns", "SAS_schema"]
+
+# scorer of the current process (inherited by forked workers)
+scorer = None
+
+# every worker opens its own connection to the persistent token cache
+def init_worker(cache_fingerprint: str):
+    scorer.cache = TokenAmbiguityCache(cache_fingerprint)
+
+# compute SAS of one schema json
+def score_schema(task):
+    dataset, level, db_id, s_hash, schema_json = task
+
+    result = scorer.schema_sas(schema_json)
+    return {"dataset": dataset, "level": level, "db_id": db_id, **result}, s_hash
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--datasets", type=str, nargs="+", choices=["spider", "bird", "kaggledbqa"], default=["spider", "bird", "kaggledbqa"])
+    parser.add_argument("--levels", type=str, nargs="+", choices=["L0", "L1", "L2", "L3"], default=["L0", "L1", "L2", "L3"])
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--index_path", type=str, default=None) # prebuilt (e.g. approximate or compressed) index artifacts
+    parser.add_argument("--out", type=str, default=f"{SAS_PATH}sas_results") # writes <out>.jsonl and <out>.csv
+    parser.add_argument("--full", action="store_true") # rescore all schemas, ignoring stored results
+    args = parser.parse_args()
+
+    # load exported embeddings (see export_embeddings.py) or the fastText model
+    model = load_embedding_model(MODEL_PATH, EMBEDDING_ARTIFACT_PATH)
+    model_fingerprint = embedding_fingerprint(model, MODEL_PATH)
+
+    # load prebuilt dictionary and FAISS index (see build_index.py) or build them
+    if args.index_path:
+        index = EmbeddingIndex.load(args.index_path)
+    else:
+        index = load_or_build_index(
+            model,
+            model_fingerprint,
+            INDEX_ARTIFACT_PATH,
+            max_words=MAX_WORDS,
+            min_len=MIN_LEN,
+            alpha_only=ALPHA_ONLY
+        )
+
+    # persistent token ambiguity cache (shared across datasets, levels and runs)
+    cache_fingerprint = token_cache_fingerprint(
+        model_fingerprint, MAX_WORDS, MIN_LEN, ALPHA_ONLY, ANCHOR_PATH,
+        index.index_type, index.index_params
+    )
+
+    # build scorer
+    scorer = SchemaAmbiguityScorer(model, index, tokenize_name)
+
+    # stored per-database results, valid as long as schema names and scorer configuration are unchanged
+    store = SASResultStore(scorer_fingerprint(cache_fingerprint, tokenize_name))
+
+    # collect schemas of all dataset variants, reuse stored results of unchanged ones
+    tasks = []
+    stored = []
+    for dataset in args.datasets:
+        for level in args.levels:
+
+            # target dir
+            if level == "L0":
+                s_path = f"{SCHEMAS_PATH}{dataset}/"
+            else:
+                s_path = f"{SCHEMAS_PATH}{dataset}_{level}/"
+
+            db_ids = []
+            for db_json in sorted(os.listdir(s_path)):
+                with open(f"{s_path}{db_json}", "r") as f:
+                    schema_json = json.load(f)
+
+                db_id = schema_json.get("db_id", db_json[:-5])
+                s_hash = schema_hash(schema_json)
+                db_ids.append(db_id)
+
+                record = None if args.full else store.get(dataset, level, db_id, s_hash)
+                if record is not None:
+                    stored.append(record)
+                else:
+                    tasks.append((dataset, level, db_id, s_hash, schema_json))
+
+            # forget databases that were removed from the variant
+            store.prune(dataset, level, db_ids)
+
+    print(f"Scoring {len(tasks)} new or changed schemas with {args.workers} worker(s), reusing {len(stored)} stored results.")
+
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    jsonl_out = open(f"{args.out}.jsonl", "w", encoding="utf-8")
+    csv_file = open(f"{args.out}.csv", "w", encoding="utf-8", newline="")
+    csv_out = csv.DictWriter(csv_file, fieldnames=CSV_FIELDS)
+    csv_out.writeheader()
+
+    if args.workers > 1 and "fork" in mp.get_all_start_methods():
+        # workers are forked after model and index are loaded and share them copy-on-write
+        pool = mp.get_context("fork").Pool(args.workers, initializer=init_worker, initargs=(cache_fingerprint,))
+        scored = pool.imap_unordered(score_schema, tasks, chunksize=4)
+    else:
+        pool = None
+        init_worker(cache_fingerprint)
+        scored = map(score_schema, tasks)
+
+    def stream_records():
+        yield from stored
+        for record, s_hash in scored:
+            store.put(record, s_hash)
+            yield record
+
+    # stream per-database results
+    results = {}
+    for record in stream_records():
+        results.setdefault((record["dataset"], record["level"]), []).append(record["SAS_schema"])
+        jsonl_out.write(json.dumps(record) + "\n")
+        jsonl_out.flush()
+        csv_out.writerow(record)
+        csv_file.flush()
+
+    if pool is not None:
+        pool.close()
+        pool.join()
+    else:
+        print(f"Token cache: {scorer.cache.hits} hits, {scorer.cache.misses} misses")
+        scorer.cache.close()
+
+    store.close()
+    jsonl_out.close()
+    csv_file.close()
+    print(f"✅ Per-database results saved to {args.out}.jsonl and {args.out}.csv")
+
+    # print final results (mean SAS_schema per dataset variant)
+    for dataset in args.datasets:
+        for level in args.levels:
+            if (dataset, level) in results:
+                print(f"{dataset} {level}: {mean(results[(dataset, level)]):.4f}")
@@ -3,6 +3,18 @@
 SCHEMAS_PATH = "data/schemas/" # holds prepared schemas once generated
 MAPPINGS_PATH = "data/mappings/" # holds mappings for anonymization procedures
 RESULTS_PATH = "data/results/" # holds responses of specified llm
+CACHE_PATH = "data/cache/" # holds persistent caches (e.g. token ambiguity)
+ARTIFACTS_PATH = "data/artifacts/" # holds prebuilt embedding artifacts
+SAS_PATH = "data/sas/" # holds per-database SAS results
+
+# prebuilt dictionary + FAISS index (see build_index.py)
+INDEX_ARTIFACT_PATH = f"{ARTIFACTS_PATH}dictionary/"
+
+# exported fastText matrix + vocabulary (see export_embeddings.py)
+EMBEDDING_ARTIFACT_PATH = f"{ARTIFACTS_PATH}fasttext/"
+
+# few-shot demonstration index over the spider training set (see build_demonstrations.py)
+DEMONSTRATION_ARTIFACT_PATH = f"{ARTIFACTS_PATH}demonstrations/"
 
 # spider paths
 SPIDER_DATABASE_PATH = "data/datasets/spider/database/"
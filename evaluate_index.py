@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import argparse
+import numpy as np
+
+from models.faiss_index import EmbeddingIndex, INDEX_TYPES, load_or_build_index, normalize_vectors, faiss_module
+from models.sas import SchemaAmbiguityScorer
+from models.subword_embedding import SubwordEmbedding, load_embedding_model, embedding_fingerprint
+from utils.vocab import get_word_vectors
+from utils.naming import tokenize_name
+from token_level_scaling import sample_calibration_tokens, MODEL_PATH
+from configs.paths import SCHEMAS_PATH, RESULTS_PATH, ARTIFACTS_PATH, INDEX_ARTIFACT_PATH, EMBEDDING_ARTIFACT_PATH
+
+"""
+
+    compares approximate FAISS backends and compressed representations
+    (PCA / fp16 / int8 indexes, float16 embedding exports) against the
+    full precision flat index on the calibration tokens of token_level_scaling.py
+    (top-1 recall, queries/s) and on the schema variants in data/schemas/
+    (mean absolute SAS_tables / SAS_columns / SAS_schema drift per dataset)
+
+"""
+
+# all schema json files of one dataset variant
+def load_schemas(dataset: str, level: str):
+    if level == "L0":
+        s_path = f"{SCHEMAS_PATH}{dataset}/"
+    else:
+        s_path = f"{SCHEMAS_PATH}{dataset}_{level}/"
+
+    if not os.path.isdir(s_path):
+        return []
+
+    schemas = []
+    for db_json in sorted(os.listdir(s_path)):
+        with open(f"{s_path}{db_json}", "r") as f:
+            schemas.append(json.load(f))
+    return schemas
+
+# top-1 search over all query vectors, returns (indices, queries per second)
+def timed_search(index: EmbeddingIndex, queries_norm: np.ndarray):
+    start_time = time.perf_counter()
+    _, indices = index.index.search(queries_norm, 1)
+    duration_seconds = time.perf_counter() - start_time
+    return indices[:, 0], len(queries_norm) / max(duration_seconds, 1e-9)
+
+# size of the serialized FAISS index in MB
+def index_size_mb(index: EmbeddingIndex) -> float:
+    return faiss_module().serialize_index(index.index).nbytes / 1e6
+
+# compare one candidate index (and optionally embedding model) with the reference
+def evaluate_backend(name, reference, candidate, tokens, schemas_by_dataset, model, candidate_model=None):
+    candidate_model = candidate_model or model
+    queries_norm = normalize_vectors(get_word_vectors(model, tokens))
+    if candidate_model is model:
+        candidate_queries_norm = queries_norm
+    else:
+        candidate_queries_norm = normalize_vectors(get_word_vectors(candidate_model, tokens))
+
+    ref_ids, ref_qps = timed_search(reference, queries_norm)
+    cand_ids, cand_qps = timed_search(candidate, candidate_queries_norm)
+
+    report = {
+        "backend": name,
+        "index_type": candidate.index_type,
+        "index_params": candidate.index_params,
+        "embeddings": "exported" if isinstance(candidate_model, SubwordEmbedding) else "fasttext",
+        "recall_at_1": float(np.mean(ref_ids == cand_ids)),
+        "qps": cand_qps,
+        "qps_flat": ref_qps,
+        "index_mb": index_size_mb(candidate),
+        "index_mb_flat": index_size_mb(reference),
+        "sas_drift": {}
+    }
+
+    ref_scorer = SchemaAmbiguityScorer(model, reference, tokenize_name)
+    cand_scorer = SchemaAmbiguityScorer(candidate_model, candidate, tokenize_name)
+
+    for dataset, schemas in schemas_by_dataset.items():
+        drifts = {"SAS_tables": [], "SAS_columns": [], "SAS_schema": []}
+        for schema_json in schemas:
+            ref = ref_scorer.schema_sas(schema_json)
+            cand = cand_scorer.schema_sas(schema_json)
+            for key in drifts:
+                drifts[key].append(abs(ref[key] - cand[key]))
+
+        if drifts["SAS_schema"]:
+            report["sas_drift"][dataset] = {key: float(np.mean(vals)) for key, vals in drifts.items()}
+            report["sas_drift"][dataset]["SAS_schema_max"] = float(np.max(drifts["SAS_schema"]))
+
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--backends", type=str, nargs="*", choices=INDEX_TYPES[1:], default=INDEX_TYPES[1:])
+    parser.add_argument("--index_params", type=str, default="{}") # json: {"hnsw": {"ef_search": 64}, ...}
+    parser.add_argument("--compressions", type=str, default="[]") # json: [{"quantization": "fp16"}, {"pca_dim": 128, "quantization": "int8"}]
+    parser.add_argument("--embeddings_export", type=str, default=None) # compressed export, e.g. float16 (see export_embeddings.py)
+    parser.add_argument("--datasets", type=str, nargs="+", default=["spider", "bird", "kaggledbqa"])
+    parser.add_argument("--levels", type=str, nargs="+", default=["L0", "L1", "L2", "L3"])
+    parser.add_argument("--out", type=str, default=f"{RESULTS_PATH}index_backends.json")
+    args = parser.parse_args()
+
+    index_params = json.loads(args.index_params)
+    compressions = json.loads(args.compressions)
+
+    # load model and exact reference index
+    model = load_embedding_model(MODEL_PATH, EMBEDDING_ARTIFACT_PATH)
+    reference = load_or_build_index(model, embedding_fingerprint(model, MODEL_PATH), INDEX_ARTIFACT_PATH)
+
+    # calibration tokens (same sample as token_level_scaling.py)
+    clear_words, noise_words = sample_calibration_tokens(reference.dict_words)
+    tokens = clear_words + noise_words
+
+    # optional compressed embeddings used by all candidates
+    candidate_model = SubwordEmbedding(args.embeddings_export) if args.embeddings_export else None
+
+    # schema variants grouped by dataset
+    schemas_by_dataset = {
+        dataset: [s for level in args.levels for s in load_schemas(dataset, level)]
+        for dataset in args.datasets
+    }
+
+    # candidates: (name, index)
+    candidates = []
+    if candidate_model is not None:
+        candidates.append(("flat_exported_embeddings", reference))
+
+    for backend in args.backends:
+        artifact_path = f"{ARTIFACTS_PATH}dictionary_{backend}/"
+        if os.path.isdir(artifact_path) and backend not in index_params:
+            print(f"Loading prebuilt {backend} index from {artifact_path}")
+            candidates.append((backend, EmbeddingIndex.load(artifact_path)))
+        else:
+            print(f"Building {backend} index...")
+            candidates.append((backend, EmbeddingIndex(
+                reference.dict_words,
+                reference.dict_vectors_norm,
+                index_type=backend,
+                index_params=index_params.get(backend)
+            )))
+
+    for compression in compressions:
+        name = "flat_" + "_".join(f"{k}{v}" for k, v in sorted(compression.items()))
+        print(f"Building {name} index...")
+        candidates.append((name, EmbeddingIndex(
+            reference.dict_words,
+            reference.dict_vectors_norm,
+            index_type="flat",
+            index_params=compression
+        )))
+
+    reports = []
+    for name, candidate in candidates:
+        report = evaluate_backend(name, reference, candidate, tokens, schemas_by_dataset, model, candidate_model)
+        reports.append(report)
+
+        drift = ", ".join(f"{d}: {v['SAS_schema']:.5f}" for d, v in report["sas_drift"].items())
+        print(f"{name} | recall@1: {report['recall_at_1']:.4f} | qps: {report['qps']:.0f} (flat: {report['qps_flat']:.0f}) | index: {report['index_mb']:.1f} MB (flat: {report['index_mb_flat']:.1f} MB) | SAS drift: {drift}")
+
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(reports, f, indent=4)
+
+    print(f"✅ Backend report saved to {args.out}")
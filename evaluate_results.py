@@ -9,13 +9,15 @@ if __name__ == '__main__':
     parser.add_argument("--dataset", type=str, choices=["spider", "bird"], default="spider")
     parser.add_argument("--level", type=str, choices=["L0", "L1", "L2", "L3"], default="L0")
     parser.add_argument("--model", type=str, choices=["gpt-5.2", "llama-3.3-70B"], default="gpt-5.2")
+    parser.add_argument("--prune", action="store_true") # evaluate a schema linking run of prompt_model.py
+    parser.add_argument("--few_shot", type=int, default=0) # evaluate a few-shot run of prompt_model.py
     args = parser.parse_args()
 
     DATASET = args.dataset
     LEVEL = args.level
     MODEL = args.model
 
-    ev = Evaluator(dataset=DATASET, level=LEVEL, model=MODEL)
+    ev = Evaluator(dataset=DATASET, level=LEVEL, model=MODEL, pruned=args.prune, few_shot=args.few_shot)
     
     # calculate exa scores
     ev.score_sql()
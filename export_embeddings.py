@@ -0,0 +1,51 @@
+import sys
+import random
+import argparse
+
+from models.subword_embedding import SubwordEmbedding, export_fasttext_model, check_parity
+from token_level_scaling import generate_random_token
+from configs.paths import EMBEDDING_ARTIFACT_PATH
+
+"""
+
+    one-time export of the fastText input matrix and vocabulary to .npy files
+    so SAS scripts can compute word vectors without loading cc.en.300.bin,
+    followed by a parity check against the real fastText vectors
+
+"""
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--model", type=str, default="cc.en.300.bin")
+    parser.add_argument("--out", type=str, default=EMBEDDING_ARTIFACT_PATH)
+    parser.add_argument("--dtype", type=str, choices=["float32", "float16"], default="float32") # float16 halves the matrix
+    parser.add_argument("--parity_words", type=int, default=2000) # per group (vocabulary / random tokens)
+    parser.add_argument("--tolerance", type=float, default=None)
+    args = parser.parse_args()
+
+    # float16 storage rounds every matrix entry
+    tolerance = args.tolerance or (1e-5 if args.dtype == "float32" else 1e-2)
+
+    # load model
+    import fasttext # loaded on first use, keeps --help and imports cheap
+    print("Loading fastText model...")
+    model = fasttext.load_model(args.model)
+
+    # export matrix, vocabulary and subword parameters
+    export_fasttext_model(model, args.model, args.out, dtype=args.dtype)
+
+    # parity check on vocabulary words and out-of-vocabulary tokens
+    random.seed(42)
+    words = model.get_words()
+    vocab_sample = random.sample(words, min(args.parity_words, len(words)))
+    oov_sample = [generate_random_token(min_len=1) for _ in range(args.parity_words)]
+
+    embedding = SubwordEmbedding(args.out)
+    diff_vocab = check_parity(model, embedding, vocab_sample)
+    diff_oov = check_parity(model, embedding, oov_sample)
+    print(f"Parity (max abs diff): vocabulary = {diff_vocab:.2e}, random tokens = {diff_oov:.2e}")
+
+    if max(diff_vocab, diff_oov) > tolerance:
+        print(f"[ERROR] Exported embeddings deviate from fastText by more than {tolerance}")
+        sys.exit(1)
@@ -0,0 +1,107 @@
+import os
+import json
+import numpy as np
+from typing import Dict, Any, List
+
+from models.faiss_index import normalize_vectors, faiss_module
+from models.schema_linker import question_tokens
+from utils.vocab import get_word_vectors
+
+# artifact file names (see DemonstrationIndex.save / DemonstrationIndex.load)
+DEMONSTRATIONS_FILE = "demonstrations.json"
+QUESTION_VECTORS_FILE = "question_vectors.npy"
+INDEX_FILE = "index.faiss"
+META_FILE = "meta.json"
+
+
+class DemonstrationIndex:
+    """
+    FAISS index over embedded training questions for few-shot prompting
+    Every demonstration keeps its SQL per anonymization level, so
+    retrieved examples match the naming style of the prompted variant.
+    """
+
+    def __init__(self, demonstrations: List[Dict[str, Any]], question_vectors: np.ndarray, index=None):
+        # demonstrations: [{"db_id": ..., "question": ..., "query": {"L0": sql, "L1": sql, ...}}, ...]
+        # question_vectors: (N, D) normalized question embeddings (see embed_questions())
+        # index: prebuilt FAISS index over question_vectors (optional)
+
+        self.demonstrations = demonstrations
+        self.question_vectors = question_vectors
+
+        if index is None:
+            faiss = faiss_module()
+            index = faiss.IndexFlatIP(question_vectors.shape[1])
+            index.add(np.ascontiguousarray(question_vectors, dtype=np.float32))
+        self.index = index
+
+    def save(self, path: str, meta: dict = None):
+        """
+        Store demonstrations, question vectors and FAISS index in path
+        """
+        os.makedirs(path, exist_ok=True)
+
+        with open(os.path.join(path, DEMONSTRATIONS_FILE), "w", encoding="utf-8") as f:
+            json.dump(self.demonstrations, f, indent=4)
+        np.save(os.path.join(path, QUESTION_VECTORS_FILE), np.ascontiguousarray(self.question_vectors, dtype=np.float32))
+        faiss_module().write_index(self.index, os.path.join(path, INDEX_FILE))
+        with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump({**(meta or {}), "demonstrations": len(self.demonstrations)}, f, indent=4)
+
+        print(f"✅ Demonstration index saved to {path}")
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "DemonstrationIndex":
+        """
+        Load artifacts written by save()
+        """
+        with open(os.path.join(path, DEMONSTRATIONS_FILE), "r", encoding="utf-8") as f:
+            demonstrations = json.load(f)
+        question_vectors = np.load(os.path.join(path, QUESTION_VECTORS_FILE), mmap_mode="r" if mmap else None)
+        index = faiss_module().read_index(os.path.join(path, INDEX_FILE))
+        return cls(demonstrations, question_vectors, index=index)
+
+    def retrieve(self, questions: List[str], embedding_model, k: int = 3, level: str = "L0") -> List[List[Dict[str, str]]]:
+        """
+        Return the top-k demonstrations ({"question", "query"}) of every question,
+        all questions are embedded and searched in one batch
+        """
+        if not questions or k <= 0:
+            return [[] for _ in questions]
+
+        vectors = embed_questions(questions, embedding_model)
+        _, indices = self.index.search(vectors, k)
+
+        results = []
+        for row in indices:
+            demos = []
+            for idx in row:
+                if idx < 0:
+                    continue
+                demo = self.demonstrations[int(idx)]
+                query = demo["query"].get(level)
+                if query is not None: # translation may have failed for this level
+                    demos.append({"question": demo["question"], "query": query})
+            results.append(demos)
+        return results
+
+
+def embed_questions(questions: List[str], embedding_model) -> np.ndarray:
+    """
+    Question embedding = normalized mean of its normalized token embeddings,
+    all distinct tokens are embedded in one batch
+    """
+    tokens_per_question = [question_tokens(q) for q in questions]
+    unique_tokens = sorted({t for tokens in tokens_per_question for t in tokens})
+    token_idx = {t: i for i, t in enumerate(unique_tokens)}
+
+    dim = embedding_model.get_dimension()
+    token_vectors = np.zeros((0, dim), dtype=np.float32)
+    if unique_tokens:
+        token_vectors = normalize_vectors(get_word_vectors(embedding_model, unique_tokens))
+
+    vectors = np.zeros((len(questions), dim), dtype=np.float32)
+    for i, tokens in enumerate(tokens_per_question):
+        if tokens:
+            vectors[i] = token_vectors[[token_idx[t] for t in tokens]].mean(axis=0)
+    return normalize_vectors(vectors)
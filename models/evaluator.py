@@ -3,11 +3,9 @@ import os
 import json
 from tqdm import tqdm
 from collections import Counter
-from func_timeout import func_timeout
 
+from models.prompt import run_name
 from configs.paths import RESULTS_PATH, SPIDER_DATABASE_PATH, BIRD_DATABASE_PATH, KAGGLEDBQA_DATABASE_PATH
-from external.testsuitesqleval.exec_eval import eval_exec_match, eval_exec_match_with_error
-from external.bird.evaluation import execute_sql, soft_execution_acc
 
 ERROR_CATEGORIES = {
     "SCHEMA_TABLE_ERROR": "EXECUTION_ERROR",
@@ -25,11 +23,12 @@ ERROR_CATEGORIES = {
 
 class Evaluator:
 
-    def __init__(self, dataset:str=None, level:str=None, model:str=None):
+    def __init__(self, dataset:str=None, level:str=None, model:str=None, pruned:bool=False, few_shot:int=0):
 
         self.dataset = dataset
         self.level = level
         self.model = model
+        self.run_name = run_name(dataset, level, model, pruned=pruned, few_shot=few_shot)
 
         if level == "L0":
             if dataset == "spider": self.db_path = SPIDER_DATABASE_PATH
@@ -39,10 +38,10 @@ class Evaluator:
         else:
             self.db_path = f"data/datasets/{dataset}_{level}/database/"
 
-        with open(f"{RESULTS_PATH}{self.dataset}_{self.level}_{self.model}_results.json", "r") as f: 
+        with open(f"{RESULTS_PATH}{self.run_name}_results.json", "r") as f: 
             self.results = json.load(f)
         
-        self.eval_path = f"{RESULTS_PATH}{self.dataset}_{self.level}_{self.model}_eval.json"
+        self.eval_path = f"{RESULTS_PATH}{self.run_name}_eval.json"
 
 
     def score_sql(self):
@@ -73,6 +72,10 @@ class Evaluator:
 
 
     def execution_accuracy(self, db_id:str, gold_sql:str, pred_sql:str):
+        # evaluation backends pull in asyncio, sqlparse and nltk, load them on first use
+        from func_timeout import func_timeout
+        from external.testsuitesqleval.exec_eval import eval_exec_match_with_error
+        from external.bird.evaluation import execute_sql, soft_execution_acc
         
         if pred_sql is None or pred_sql == "":
             return 0, 0, "LLM_SYSTEM_ERROR"
@@ -1,7 +1,54 @@
+import os
+import json
 import numpy as np
-import faiss
+from collections.abc import Sequence
 from typing import List, Tuple
 
+from utils.vocab import build_dictionary_from_fasttext, MAX_WORDS, MIN_LEN, ALPHA_ONLY
+
+# artifact file names (see EmbeddingIndex.save / EmbeddingIndex.load)
+VECTORS_FILE = "dict_vectors.npy"
+WORDS_FILE = "dict_words.npy"
+INDEX_FILE = "index.faiss"
+META_FILE = "meta.json"
+
+# supported index types and their default build / search parameters
+INDEX_TYPES = ["flat", "ivf_flat", "hnsw", "ivf_pq"]
+DEFAULT_INDEX_PARAMS = {
+    "flat": {},
+    "ivf_flat": {"nlist": 1024, "nprobe": 16},
+    "hnsw": {"M": 32, "ef_construction": 200, "ef_search": 128},
+    "ivf_pq": {"nlist": 1024, "nprobe": 32, "pq_m": 50, "pq_nbits": 8},
+}
+
+# optional compression, given as extra index_params:
+# - pca_dim: project to this dimension (PCA + re-normalization inside the index)
+# - quantization: store codes as fp16 / int8 (FAISS scalar quantizer)
+QUANTIZATION_TYPES = {
+    "fp16": "QT_fp16",
+    "int8": "QT_8bit",
+}
+
+# faiss is imported on first use (see faiss_module()), importing this module stays cheap
+
+
+class DictionaryWords(Sequence):
+    """
+    Read-only word list over the fixed-width UTF-8 array of the artifacts,
+    words are only decoded when accessed
+    """
+
+    def __init__(self, words: np.ndarray):
+        self.words = words
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [w.decode("utf-8") for w in self.words[i].tolist()]
+        return self.words[i].decode("utf-8")
+
 
 class EmbeddingIndex:
     """
@@ -9,19 +56,91 @@ class EmbeddingIndex:
     over dictionary embeddings
     """
 
-    def __init__(self, dict_words: List[str], dict_vectors: np.ndarray):
-        # dict_words: list of vocabulary words
-        # dict_vectors: (N, D) float32 numpy matrix
+    def __init__(
+        self,
+        dict_words: List[str],
+        dict_vectors: np.ndarray,
+        index=None,
+        index_type: str = "flat",
+        index_params: dict = None
+    ):
+        # dict_words: list of vocabulary words (or DictionaryWords of loaded artifacts)
+        # dict_vectors: (N, D) float32 numpy matrix (None if a compressed index is given)
+        # index: prebuilt FAISS index over the normalized dict_vectors (optional)
+        # index_type: one of INDEX_TYPES (flat = exact search)
+        # index_params: build / search parameters overriding DEFAULT_INDEX_PARAMS,
+        #               may include compression parameters pca_dim / quantization
         
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type: {index_type}")
+
         self.dict_words = dict_words
-        self.dim = dict_vectors.shape[1]
+        self.word_ids = None # encoded word -> id, built by the first has_word call
+        self.dim = dict_vectors.shape[1] if dict_vectors is not None else index.d
+        self.index_type = index_type
+        self.index_params = {**DEFAULT_INDEX_PARAMS[index_type], **(index_params or {})}
+
+        if index is not None:
+            # vectors and index come prebuilt (and normalized) from disk
+            self.dict_vectors_norm = dict_vectors
+            self.index = index
+            set_search_params(self.index, self.index_type, self.index_params)
+            return
 
         # normalize dictionary vectors
         self.dict_vectors_norm = normalize_vectors(dict_vectors.astype("float32"))
 
         # build FAISS index (inner product)
-        self.index = faiss.IndexFlatIP(self.dim)
-        self.index.add(self.dict_vectors_norm)  # add all dictionary embeddings
+        self.index = build_faiss_index(self.dict_vectors_norm, self.index_type, self.index_params)
+
+        # compressed indexes do not keep the full precision matrix around
+        if self.is_compressed():
+            self.dict_vectors_norm = None
+
+    def is_compressed(self) -> bool:
+        return bool(self.index_params.get("pca_dim") or self.index_params.get("quantization"))
+
+    def save(self, path: str, meta: dict = None):
+        """
+        Store normalized vectors (.npy), word list and FAISS index in path
+        """
+        os.makedirs(path, exist_ok=True)
+
+        vectors_path = os.path.join(path, VECTORS_FILE)
+        if self.dict_vectors_norm is not None:
+            np.save(vectors_path, np.ascontiguousarray(self.dict_vectors_norm, dtype=np.float32))
+        elif os.path.exists(vectors_path):
+            os.remove(vectors_path) # stale full precision vectors
+        np.save(os.path.join(path, WORDS_FILE), encode_words(self.dict_words))
+        faiss_module().write_index(self.index, os.path.join(path, INDEX_FILE))
+
+        meta = {**(meta or {}), "index_type": self.index_type, "index_params": self.index_params}
+        with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=4)
+
+        print(f"✅ Index artifacts saved to {path}")
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "EmbeddingIndex":
+        """
+        Load artifacts written by save(), vectors and index are memory-mapped
+        so several processes share the same pages
+        """
+        mmap_mode = "r" if mmap else None
+        vectors_path = os.path.join(path, VECTORS_FILE)
+        dict_vectors = np.load(vectors_path, mmap_mode=mmap_mode) if os.path.exists(vectors_path) else None
+        dict_words = DictionaryWords(np.load(os.path.join(path, WORDS_FILE), mmap_mode=mmap_mode))
+        faiss = faiss_module()
+        mmap_flag = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) # memory-map flat index codes where supported (faiss >= 1.11)
+        index = faiss.read_index(os.path.join(path, INDEX_FILE), mmap_flag if mmap else 0)
+        meta = read_index_meta(path)
+        return cls(
+            dict_words,
+            dict_vectors,
+            index=index,
+            index_type=meta.get("index_type", "flat"),
+            index_params=meta.get("index_params")
+        )
 
     def nearest_neighbor(self, query_vec: np.ndarray, k: int = 1):
         """
@@ -48,6 +167,29 @@ class EmbeddingIndex:
         word = self.dict_words[idx]
         return word, sim
 
+    def has_word(self, word: str) -> bool:
+        """
+        True if word is an exact dictionary entry
+        """
+        if self.word_ids is None:
+            self.word_ids = {w: i for i, w in enumerate(encode_words(self.dict_words).tolist())}
+        return word.encode("utf-8") in self.word_ids
+
+def encode_words(dict_words) -> np.ndarray:
+    """
+    Words as compact fixed-width UTF-8 bytes (the format of WORDS_FILE)
+    """
+    if isinstance(dict_words, DictionaryWords):
+        return dict_words.words
+    return np.array([w.encode("utf-8") for w in dict_words], dtype=np.bytes_)
+
+def faiss_module():
+    """
+    Import faiss on first use
+    """
+    import faiss
+    return faiss
+
 def normalize_vectors(vectors: np.ndarray) -> np.ndarray:
     """
     L2-normalize vectors along axis 1
@@ -56,4 +198,145 @@ def normalize_vectors(vectors: np.ndarray) -> np.ndarray:
     """
     norms = np.linalg.norm(vectors, axis=1, keepdims=True)
     norms[norms == 0] = 1.0
-    return vectors / norms
\ No newline at end of file
+    return vectors / norms
+
+def build_faiss_index(vectors_norm: np.ndarray, index_type: str = "flat", params: dict = None):
+    """
+    Build (and train) an inner product FAISS index over normalized vectors,
+    optionally behind a PCA projection and with scalar quantized storage
+    """
+    faiss = faiss_module()
+    params = {**DEFAULT_INDEX_PARAMS[index_type], **(params or {})}
+    dim = vectors_norm.shape[1]
+    metric = faiss.METRIC_INNER_PRODUCT
+
+    # PCA projection (vectors are re-normalized so inner product stays cosine)
+    pca_dim = params.get("pca_dim")
+    if pca_dim:
+        transforms = [projection_transform(vectors_norm, pca_dim), faiss.NormalizationTransform(pca_dim)]
+        dim = pca_dim
+
+    quantization = params.get("quantization")
+    if quantization and quantization not in QUANTIZATION_TYPES:
+        raise ValueError(f"Unknown quantization: {quantization}")
+    qtype = getattr(faiss.ScalarQuantizer, QUANTIZATION_TYPES[quantization]) if quantization else None
+
+    if index_type == "flat":
+        if qtype is None:
+            index = faiss.IndexFlatIP(dim)
+        else:
+            index = faiss.IndexScalarQuantizer(dim, qtype, metric)
+    elif index_type == "ivf_flat":
+        quantizer = faiss.IndexFlatIP(dim)
+        if qtype is None:
+            index = faiss.IndexIVFFlat(quantizer, dim, params["nlist"], metric)
+        else:
+            index = faiss.IndexIVFScalarQuantizer(quantizer, dim, params["nlist"], qtype, metric)
+    elif index_type == "hnsw":
+        if qtype is None:
+            index = faiss.IndexHNSWFlat(dim, params["M"], metric)
+        else:
+            index = faiss.IndexHNSWSQ(dim, qtype, params["M"], metric)
+        index.hnsw.efConstruction = params["ef_construction"]
+    elif index_type == "ivf_pq":
+        if qtype is not None:
+            raise ValueError("ivf_pq is already compressed, quantization is not supported.")
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFPQ(quantizer, dim, params["nlist"], params["pq_m"], params["pq_nbits"], metric)
+    else:
+        raise ValueError(f"Unknown index type: {index_type}")
+
+    if pca_dim:
+        index = faiss.IndexPreTransform(transforms[1], index) # re-normalize, then search
+        index.prepend_transform(transforms[0]) # project first
+
+    if not index.is_trained:
+        index.train(vectors_norm)
+    index.add(vectors_norm)
+
+    set_search_params(index, index_type, params)
+    return index
+
+def projection_transform(vectors_norm: np.ndarray, dim_out: int):
+    """
+    Linear projection onto the top principal directions of the (uncentered)
+    vectors, uncentered so that cosine similarities are preserved
+    """
+    faiss = faiss_module()
+    x = np.asarray(vectors_norm, dtype=np.float64)
+    _, eigvecs = np.linalg.eigh(x.T @ x) # ascending eigenvalues
+    components = eigvecs[:, ::-1][:, :dim_out].T.astype(np.float32) # (dim_out, D)
+
+    transform = faiss.LinearTransform(x.shape[1], dim_out, False)
+    faiss.copy_array_to_vector(np.ascontiguousarray(components).ravel(), transform.A)
+    transform.is_trained = True
+    return transform
+
+def unwrap_index(index):
+    """
+    Return the index behind (nested) IndexPreTransform wrappers
+    """
+    faiss = faiss_module()
+    index = faiss.downcast_index(index)
+    while isinstance(index, faiss.IndexPreTransform):
+        index = faiss.downcast_index(index.index)
+    return index
+
+def set_search_params(index, index_type: str, params: dict):
+    """
+    Apply query-time parameters (not persisted by faiss.write_index)
+    """
+    if index_type in ("ivf_flat", "ivf_pq"):
+        faiss_module().extract_index_ivf(index).nprobe = params["nprobe"]
+    elif index_type == "hnsw":
+        unwrap_index(index).hnsw.efSearch = params["ef_search"]
+
+def read_index_meta(path: str) -> dict:
+    """
+    Return the meta data stored next to the artifacts (empty if missing)
+    """
+    meta_path = os.path.join(path, META_FILE)
+    if not os.path.exists(meta_path):
+        return {}
+    with open(meta_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def load_or_build_index(
+    ft_model,
+    model_fingerprint: str,
+    artifact_path: str,
+    max_words: int = MAX_WORDS,
+    min_len: int = MIN_LEN,
+    alpha_only: bool = ALPHA_ONLY,
+    index_type: str = "flat",
+    index_params: dict = None
+) -> EmbeddingIndex:
+    """
+    Load prebuilt index artifacts if they match model, dictionary
+    parameters, index type and index parameters (incl. compression),
+    otherwise build them in memory
+    """
+    meta = dictionary_meta(model_fingerprint, max_words, min_len, alpha_only)
+    meta["index_type"] = index_type
+    meta["index_params"] = {**DEFAULT_INDEX_PARAMS[index_type], **(index_params or {})} # as stored by EmbeddingIndex.save()
+    stored = read_index_meta(artifact_path)
+    if all(stored.get(key) == value for key, value in meta.items()):
+        print(f"Loading prebuilt index from {artifact_path}")
+        return EmbeddingIndex.load(artifact_path)
+
+    dict_words, dict_vectors = build_dictionary_from_fasttext(
+        ft_model,
+        max_words=max_words,
+        min_len=min_len,
+        alpha_only=alpha_only
+    )
+    return EmbeddingIndex(dict_words, dict_vectors, index_type=index_type, index_params=index_params)
+
+def dictionary_meta(model_fingerprint: str, max_words: int, min_len: int, alpha_only: bool) -> dict:
+    # identifies which model and parameters an artifact was built from
+    return {
+        "model_fingerprint": model_fingerprint,
+        "max_words": max_words,
+        "min_len": min_len,
+        "alpha_only": alpha_only,
+    }
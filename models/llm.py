@@ -1,7 +1,6 @@
 import os
 import time
 import json
-from openai import OpenAI
 
 TOOL_NAME = "t2sql_tool"
 TOOL = {
@@ -27,6 +26,8 @@ TOOL = {
 class LLM:
 
     def __init__(self, provider:str = "openai", model:str = "gpt-5"):
+        from openai import OpenAI # loaded on first use
+
         self.provider = provider
         self.model = model
 
@@ -14,10 +14,12 @@ INIT_INSTRUCTION = (
 
 class Prompter:
 
-    def __init__(self, provider:str = "openai", model:str = "gpt-5.2", schema_string:str = None):
+    def __init__(self, provider:str = "openai", model:str = "gpt-5.2", schema_string:str = None, demonstrations:list = None):
+        # demonstrations: optional few-shot examples [{"question": ..., "query": ...}, ...]
         self.provider = provider
         self.model = model
         self.llm = LLM(provider=self.provider, model=self.model)
+        self.demonstrations = demonstrations or []
 
         if schema_string:
             self.schema_string = schema_string
@@ -37,9 +39,30 @@ class Prompter:
         messages = [
             { "role": "system", "content": INIT_INSTRUCTION },
             { "role": "system", "content": self.schema_string },
-            { "role": "user", "content": question }
         ]
 
+        if self.demonstrations:
+            messages.append({ "role": "system", "content": demonstration_string(self.demonstrations) })
+
+        messages.append({ "role": "user", "content": question })
+
         return messages
 
 
+# few-shot examples (from other databases) as one system message
+def demonstration_string(demonstrations):
+    demo_string = "## Examples (other databases) \n\n"
+    for demo in demonstrations:
+        demo_string += f"Question: {demo['question']}\nSQL: {demo['query']}\n\n"
+    return demo_string
+
+# file name stem of a prompting run in configs.paths.RESULTS_PATH
+def run_name(dataset:str, level:str, model:str, pruned:bool = False, few_shot:int = 0):
+    name = f"{dataset}_{level}_{model}"
+    if pruned:
+        name += "_pruned" # schema linking
+    if few_shot:
+        name += f"_fewshot{few_shot}"
+    return name
+
+
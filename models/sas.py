@@ -1,7 +1,8 @@
 # utils/schema_sas.py
 
-from typing import Dict, Any, Callable, List
-from utils.ambiguity import name_sas
+import numpy as np
+from typing import Dict, Any, Callable, List, Tuple
+from utils.ambiguity import name_sas, name_sas_batch
 
 
 class SchemaAmbiguityScorer:
@@ -10,24 +11,41 @@ class SchemaAmbiguityScorer:
     Uses calibrated token ambiguity under the hood.
     """
 
-    def __init__(self, embedding_model, faiss_index, tokenizer: Callable[[str], List[str]]):
+    def __init__(self, embedding_model, faiss_index, tokenizer: Callable[[str], List[str]], batched: bool = True, cache=None):
         # embedding_model: fastText model (loaded)
         # faiss_index: FAISS index over dictionary embeddings
         # tokenizer: function that converts name -> list of tokens
+        # batched: score all names of a schema with one FAISS search
+        # cache: optional TokenAmbiguityCache for raw token ambiguities
         
         self.embedding_model = embedding_model
         self.faiss_index = faiss_index
         self.tokenizer = tokenizer
+        self.batched = batched
+        self.cache = cache
 
     def db_object_sas(self, object_name: str) -> float:
         return name_sas(
             object_name,
             self.tokenizer,
             self.embedding_model,
-            self.faiss_index
+            self.faiss_index,
+            self.cache
+        )
+
+    def names_sas(self, names: List[str]) -> np.ndarray:
+        return name_sas_batch(
+            names,
+            self.tokenizer,
+            self.embedding_model,
+            self.faiss_index,
+            self.cache
         )
 
     def schema_sas(self, schema_json: Dict[str, Any]) -> Dict[str, float]:
+        if self.batched:
+            return self.schema_sas_batch(schema_json)
+
         schema_dict = schema_json["schema"]
 
         table_scores = []
@@ -54,3 +72,35 @@ class SchemaAmbiguityScorer:
             "SAS_columns": SAS_columns,
             "SAS_schema": SAS_schema
         }
+
+    def schema_sas_batch(self, schema_json: Dict[str, Any]) -> Dict[str, float]:
+        # one batch over all names of the schema
+        table_names, column_names = schema_names(schema_json)
+        scores = self.names_sas(table_names + column_names)
+        return aggregate_sas(scores, len(table_names))
+
+
+def schema_names(schema_json: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    # collect all table and column names of a schema json up front
+    schema_dict = schema_json["schema"]
+
+    table_names = list(schema_dict.keys())
+    column_names = [
+        col["name"]
+        for table_data in schema_dict.values()
+        for col in table_data["columns"]
+    ]
+    return table_names, column_names
+
+
+def aggregate_sas(scores: np.ndarray, n_tables: int) -> Dict[str, float]:
+    # scores: name SAS of all table names followed by all column names
+    scores = np.asarray(scores)
+    table_scores = scores[:n_tables]
+    column_scores = scores[n_tables:]
+
+    return {
+        "SAS_tables": float(table_scores.mean()),
+        "SAS_columns": float(column_scores.mean()),
+        "SAS_schema": float(scores.mean())
+    }
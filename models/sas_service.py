@@ -0,0 +1,185 @@
+import os
+import json
+import queue
+import threading
+import urllib.request
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Callable
+
+from models.sas import SchemaAmbiguityScorer, schema_names, aggregate_sas
+from models.schema_builder import SchemaBuilder
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+class SASBatcher:
+    """
+    Funnels concurrent scoring requests into one scorer thread
+    Names of all requests that arrive within a short window are
+    scored with a single batched FAISS search and split up again.
+    """
+
+    def __init__(self, scorer: SchemaAmbiguityScorer, cache_factory: Callable = None, max_batch_names: int = 50000, max_wait_ms: float = 5.0):
+        # scorer: warm SchemaAmbiguityScorer (model and index loaded)
+        # cache_factory: optional callable returning a TokenAmbiguityCache,
+        #                opened inside the scorer thread (SQLite connections are thread bound)
+        # max_batch_names: upper bound of names per FAISS search
+        # max_wait_ms: how long to wait for further requests after the first one
+
+        self.scorer = scorer
+        self.cache_factory = cache_factory
+        self.max_batch_names = max_batch_names
+        self.max_wait = max_wait_ms / 1000
+        self.requests = queue.Queue()
+        self.batches = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, names: List[str]) -> Future:
+        future = Future()
+        self.requests.put((list(names), future))
+        return future
+
+    def score_names(self, names: List[str]) -> List[float]:
+        return self.submit(names).result()
+
+    def score_schema(self, schema_json: Dict[str, Any]) -> Dict[str, float]:
+        table_names, column_names = schema_names(schema_json)
+        scores = self.score_names(table_names + column_names)
+        return aggregate_sas(scores, len(table_names))
+
+    def score_sqlite(self, db_path: str) -> Dict[str, Any]:
+        if not os.path.isfile(db_path):
+            raise FileNotFoundError(f"No sqlite file found at {db_path}") # sqlite3.connect would create an empty one
+        db_id = os.path.splitext(os.path.basename(db_path))[0]
+        with SchemaBuilder(db_id=db_id, db_path=db_path) as sb:
+            schema_json = sb.build_schema_object()
+        return {"tables": len(schema_json["schema"]), **self.score_schema(schema_json)}
+
+    def _collect(self):
+        # block for the first request, then gather more until the window closes
+        batch = [self.requests.get()]
+        n_names = len(batch[0][0])
+        while n_names < self.max_batch_names:
+            try:
+                item = self.requests.get(timeout=self.max_wait)
+            except queue.Empty:
+                break
+            batch.append(item)
+            n_names += len(item[0])
+        return batch
+
+    def _run(self):
+        if self.cache_factory is not None:
+            self.scorer.cache = self.cache_factory()
+
+        while True:
+            batch = self._collect()
+            names = [name for item_names, _ in batch for name in item_names]
+            try:
+                scores = self.scorer.names_sas(names).tolist()
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            start = 0
+            for item_names, future in batch:
+                future.set_result(scores[start:start + len(item_names)])
+                start += len(item_names)
+
+
+class SASRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON endpoints of the scoring daemon
+    POST /score_names  {"names": [...]}        -> {"scores": [...]}
+    POST /score_schema {"schema_json": {...}}  -> {"SAS_tables": ..., "SAS_columns": ..., "SAS_schema": ...}
+    POST /score_sqlite {"db_path": "..."}      -> {"tables": ..., "SAS_tables": ..., ...}
+    GET  /health                               -> {"status": "ok", "batches": ...}
+    """
+
+    batcher: SASBatcher = None # set by make_server()
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"status": "ok", "batches": self.batcher.batches})
+        else:
+            self._send(404, {"error": f"Unknown endpoint: {self.path}"})
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+
+            if self.path == "/score_names":
+                result = {"scores": self.batcher.score_names(payload["names"])}
+            elif self.path == "/score_schema":
+                result = self.batcher.score_schema(payload["schema_json"])
+            elif self.path == "/score_sqlite":
+                result = self.batcher.score_sqlite(payload["db_path"])
+            else:
+                self._send(404, {"error": f"Unknown endpoint: {self.path}"})
+                return
+        except (KeyError, ValueError, FileNotFoundError) as e:
+            self._send(400, {"error": f"Bad request: {e!r}"})
+            return
+        except Exception as e:
+            self._send(500, {"error": repr(e)})
+            return
+
+        self._send(200, result)
+
+    def _send(self, status: int, body: Dict[str, Any]):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass # keep the console quiet, one line per request is too much for batch clients
+
+
+class SASHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128 # many clients connect at once when scoring in bulk
+
+
+def make_server(batcher: SASBatcher, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> SASHTTPServer:
+    handler = type("BoundSASRequestHandler", (SASRequestHandler,), {"batcher": batcher})
+    return SASHTTPServer((host, port), handler)
+
+
+class SASClient:
+    """
+    Thin client of the scoring daemon (see sas_server.py)
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, timeout: float = 600):
+        self.url = f"http://{host}:{port}"
+        self.timeout = timeout
+
+    def _request(self, endpoint: str, payload: Dict[str, Any] = None) -> Dict[str, Any]:
+        data = None if payload is None else json.dumps(payload).encode("utf-8")
+        req = urllib.request.Request(f"{self.url}/{endpoint}", data=data, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return json.loads(resp.read())
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(f"SAS server error ({e.code}): {e.read().decode('utf-8')}") from None
+
+    def health(self) -> Dict[str, Any]:
+        return self._request("health")
+
+    def score_names(self, names: List[str]) -> List[float]:
+        return self._request("score_names", {"names": names})["scores"]
+
+    def score_schema(self, schema_json: Dict[str, Any]) -> Dict[str, float]:
+        return self._request("score_schema", {"schema_json": schema_json})
+
+    def score_sqlite(self, db_path: str) -> Dict[str, Any]:
+        return self._request("score_sqlite", {"db_path": db_path})
@@ -0,0 +1,118 @@
+import os
+import inspect
+import sqlite3
+from typing import Dict, Any, Callable, List
+
+from utils.hashing import fingerprint
+from configs.paths import SAS_PATH
+
+SAS_STORE_PATH = f"{SAS_PATH}sas_store.sqlite"
+SAS_FIELDS = ["SAS_tables", "SAS_columns", "SAS_schema"]
+SCORER_VERSION = 2 # bump when scores change without a change in the fingerprinted sources
+
+
+class SASResultStore:
+    """
+    Persistent per-database SAS results
+    Every row remembers the hash of the schema names and the scorer
+    fingerprint it was computed with, so reruns only rescore
+    new or changed schemas and re-aggregate from stored results.
+    """
+
+    def __init__(self, scorer_fingerprint: str, path: str = SAS_STORE_PATH):
+        # scorer_fingerprint: see scorer_fingerprint()
+        # path: SQLite file holding the results
+
+        self.fingerprint = scorer_fingerprint
+        self.path = path
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute(
+            """ CREATE TABLE IF NOT EXISTS sas_results (
+                    dataset TEXT NOT NULL,
+                    level TEXT NOT NULL,
+                    db_id TEXT NOT NULL,
+                    schema_hash TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    SAS_tables REAL NOT NULL,
+                    SAS_columns REAL NOT NULL,
+                    SAS_schema REAL NOT NULL,
+                    PRIMARY KEY (dataset, level, db_id)
+                ) WITHOUT ROWID;
+            """
+        )
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+        self.conn = None
+
+    def get(self, dataset: str, level: str, db_id: str, schema_hash: str) -> Dict[str, Any]:
+        """
+        Return the stored record if it is still valid for schema_hash and the scorer, else None
+        """
+        row = self.conn.execute(
+            """ SELECT SAS_tables, SAS_columns, SAS_schema FROM sas_results
+                WHERE dataset = ? AND level = ? AND db_id = ? AND schema_hash = ? AND fingerprint = ?;
+            """,
+            (dataset, level, db_id, schema_hash, self.fingerprint)
+        ).fetchone()
+
+        if row is None:
+            return None
+        return {"dataset": dataset, "level": level, "db_id": db_id, **dict(zip(SAS_FIELDS, row))}
+
+    def put(self, record: Dict[str, Any], schema_hash: str):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO sas_results VALUES (?, ?, ?, ?, ?, ?, ?, ?);",
+            (record["dataset"], record["level"], record["db_id"], schema_hash, self.fingerprint,
+             *[float(record[field]) for field in SAS_FIELDS])
+        )
+        self.conn.commit()
+
+    def prune(self, dataset: str, level: str, db_ids: List[str]) -> int:
+        """
+        Delete results of databases no longer present in a dataset variant, returns number of removed rows
+        """
+        placeholders = ", ".join(["?"] * len(db_ids))
+        cur = self.conn.execute(
+            f"DELETE FROM sas_results WHERE dataset = ? AND level = ? AND db_id NOT IN ({placeholders});",
+            (dataset, level, *db_ids)
+        )
+        self.conn.commit()
+        return cur.rowcount
+
+
+def schema_hash(schema_json: Dict[str, Any]) -> str:
+    # hash of the table and column names, the only schema content SAS depends on
+    return fingerprint(*[
+        (table_name, [col["name"] for col in table_data["columns"]])
+        for table_name, table_data in schema_json["schema"].items()
+    ])
+
+
+def scorer_fingerprint(cache_fingerprint: str, tokenizer: Callable) -> str:
+    # cache_fingerprint covers model, dictionary, index and anchors (see token_cache_fingerprint())
+    # the tokenizer and the scoring code (name splitting, EPSILON, scaling, batched shortcuts,
+    # aggregation) are identified by their source, SCORER_VERSION covers anything else
+    import utils.naming
+    import utils.ambiguity
+    import models.sas
+
+    sources = [_source(tokenizer)] + [_source(module) for module in (utils.naming, utils.ambiguity, models.sas)]
+    return fingerprint(cache_fingerprint, SCORER_VERSION, *sources)
+
+
+def _source(obj) -> str:
+    try:
+        return inspect.getsource(obj)
+    except (OSError, TypeError):
+        return getattr(obj, "__qualname__", repr(obj))
@@ -1,14 +1,17 @@
 import re
 import os
+import copy
 import json
+import time
 import sqlite3
-import sqlglot
-from sqlglot import exp
-from typing import List
+from typing import List, Dict, Any, Union, Optional
+from dataclasses import dataclass
 
 from utils.naming import analyze_name
 from utils.policy import choose_operator
 from utils.operators import apply_operator
+from utils.sql import query_plan
+from utils.dataset import dev_samples_by_db
 from configs.paths import (
     SCHEMAS_PATH, MAPPINGS_PATH, SPIDER_DATABASE_PATH, 
     BIRD_DATABASE_PATH, KAGGLEDBQA_DATABASE_PATH,
@@ -34,12 +37,36 @@ SQL_KEYWORDS = {
     "transaction", "trigger", "union", "unique", "update", "using", "vacuum",
     "values", "view", "virtual", "when", "where", "with", "without"
 }
+COPY_CHUNK_SIZE = 10000 # rows fetched and decoded at once in copy_data_stream
+FICLONE = 0x40049409 # linux ioctl request for reflink copies (btrfs, xfs, ...)
+RECREATE_MODES = ["copy", "rename"]
+
+# connection settings and finishing steps while building a database in copy mode
+@dataclass
+class BulkLoadProfile:
+    journal_mode: str = "OFF" # a failed build is simply rebuilt, no rollback journal needed
+    synchronous: str = "OFF"
+    page_size: int = 4096
+    cache_size: int = -65536 # negative = KiB (64 MB per worker)
+    analyze: Optional[bool] = None # planner statistics (sqlite_stat1), None = only if the original database has them
+    vacuum: bool = False # compact file after load (a fresh sequential load has few free pages)
+
+    def apply(self, conn, schema:str="main"):
+        conn.execute(f"PRAGMA {schema}.journal_mode = {self.journal_mode};")
+        conn.execute(f"PRAGMA {schema}.synchronous = {self.synchronous};")
+        conn.execute(f"PRAGMA {schema}.cache_size = {self.cache_size};")
+
+BULK_LOAD_PROFILES = {
+    "default": BulkLoadProfile(journal_mode="DELETE", synchronous="FULL", cache_size=-2000, vacuum=False), # sqlite defaults
+    "bulk": BulkLoadProfile(),
+    "bulk_large": BulkLoadProfile(page_size=16384, cache_size=-262144, vacuum=True) # multi-GB databases (BIRD)
+}
 
 
 class SchemaAnonymizer():
 
 
-    def __init__(self, dataset:str, db_id:str):
+    def __init__(self, dataset:str, db_id:str, samples:Optional[List[Dict[str, Any]]]=None):
         
         self.dataset = dataset
         self.db_id = db_id
@@ -66,17 +93,24 @@ class SchemaAnonymizer():
             schema = json.load(f)
         self.schema = schema["schema"]
 
-        # load samples
-        with open(self.dev_path, "r") as f: 
-            samples = json.load(f)
-        self.samples = [sample for sample in samples if sample["db_id"] == self.db_id]
+        # samples of this database, the dev set is parsed and indexed once per process (utils.dataset)
+        if samples is None:
+            samples = dev_samples_by_db(self.dataset).get(self.db_id, [])
+        self.samples = samples
 
         self.level = None
         self.mapping = {} # maps old to new names
         self.mapping_reverse = {} # maps new to old names
         self.metadata = {} # documents metadata of mapping process
+        self.name_features = {} # analyze_name results, independent of the level
         self.dev_new = []
 
+        self.profile = BULK_LOAD_PROFILES["default"]
+        self.index_stmts = [] # secondary indexes, created after the data is loaded
+        self.index_sources = [] # original index name per statement of index_stmts
+        self.index_mapping = {} # maps old to new index names
+        self.timings = {} # seconds per phase of recreate_database
+
 
     #
     # mapping
@@ -113,7 +147,9 @@ class SchemaAnonymizer():
                 new_name = self.mapping[canonical]
 
             else:
-                nf = analyze_name(name)
+                if name not in self.name_features:
+                    self.name_features[name] = analyze_name(name)
+                nf = self.name_features[name]
                 op = choose_operator(level, nf)
                 new_name = apply_operator(op, nf, level)
 
@@ -152,17 +188,96 @@ class SchemaAnonymizer():
         
         print(f"✅ Mapping saved to {out_path}")
 
+    # anonymizer of another level sharing schema, samples and name features
+    # (a fresh instance per level, mappings equal those of new SchemaAnonymizer objects)
+    def for_level(self, level:str) -> "SchemaAnonymizer":
+        anon = copy.copy(self)
+        anon.mapping = {}
+        anon.mapping_reverse = {}
+        anon.metadata = {}
+        anon.dev_new = []
+        anon.index_stmts = []
+        anon.index_sources = []
+        anon.index_mapping = {}
+        anon.timings = {}
+        anon.generate_mapping(level=level)
+        return anon
+
 
 
     #
     # recreate databases
     #
 
-    # wrapper function to recreate databases
-    def recreate_database(self):
+    # wrapper function to recreate databases, returns seconds per phase
+    # mode "copy": create the schema from the schema json and copy all rows (using the bulk load profile)
+    # mode "rename": clone the database file and rename tables and columns in place,
+    # falls back to "copy" if the renamed schema differs from the create statements
+    def recreate_database(self, mode:str="copy", profile:Union[str, BulkLoadProfile]="bulk") -> Dict[str, float]:
+        if mode not in RECREATE_MODES:
+            raise ValueError(f"Unknown recreate mode: {mode}")
+        profile = resolve_profile(profile)
+
+        self.timings = {}
         self.sql_create_statements()
-        self.create_new_sqlite_db()
-        self.copy_data()
+        if mode == "rename":
+            try:
+                self._timed("clone", self.clone_database)
+                self._timed("rename", self.rename_schema)
+                mismatches = self._timed("verify", self.verify_schema)
+            except sqlite3.Error as e:
+                mismatches = [repr(e)]
+
+            if not mismatches:
+                return self.timings
+            print(f"Rename mode not applicable for {self.db_id} ({mismatches[0]}), copying data instead.")
+
+        self.profile = profile
+        self.sql_index_statements()
+        self._timed("create", self.create_new_sqlite_db)
+        self._timed("copy", self.copy_data)
+        self.finish_database()
+        return self.timings
+
+    # recreate the databases of several levels, returns one anonymizer per level
+    # copy mode reads every original table once and fans the rows out to all levels
+    def recreate_databases(self, levels:List[str], mode:str="copy", profile:Union[str, BulkLoadProfile]="bulk") -> List["SchemaAnonymizer"]:
+        if mode not in RECREATE_MODES:
+            raise ValueError(f"Unknown recreate mode: {mode}")
+        profile = resolve_profile(profile)
+
+        anons = [self.for_level(level) for level in levels]
+        if mode == "rename" or len(anons) == 1:
+            for anon in anons:
+                anon.recreate_database(mode=mode, profile=profile)
+            return anons
+
+        for anon in anons:
+            anon.profile = profile
+            anon.sql_create_statements()
+            anon.sql_index_statements()
+            anon._timed("create", anon.create_new_sqlite_db)
+
+        first, others = anons[0], anons[1:]
+        first._timed("copy", first.copy_data, targets=others)
+        for anon in anons:
+            anon.finish_database()
+        return anons
+
+    # secondary indexes, statistics and compaction after the data is loaded
+    def finish_database(self):
+        self._timed("indexes", self.create_indexes)
+        if self.profile.analyze or (self.profile.analyze is None and self.has_statistics()):
+            self._timed("analyze", self.analyze_database)
+        if self.profile.vacuum:
+            self._timed("vacuum", self.vacuum_database)
+
+    # run fn and add its duration to phase
+    def _timed(self, phase:str, fn, *args, **kwargs):
+        start_time = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.timings[phase] = self.timings.get(phase, 0.0) + time.perf_counter() - start_time
+        return result
 
     # create CREATE statements
     def sql_create_statements(self):
@@ -227,6 +342,65 @@ class SchemaAnonymizer():
         self.create_stmts = stmts
         return self.create_stmts
 
+    # create CREATE INDEX statements of the original secondary indexes and unique constraints
+    def sql_index_statements(self):
+
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        indexes = conn.execute(
+            "SELECT name, tbl_name, sql FROM sqlite_master WHERE type='index' ORDER BY tbl_name, name;"
+        ).fetchall()
+
+        stmts = []
+        sources = []
+        self.index_mapping = {}
+        taken = {name.lower() for name in self.mapping_reverse}
+        for idx_name, tbl_name, sql in indexes:
+
+            new_tbl = self.mapping.get(tbl_name.lower())
+            if new_tbl is None:
+                continue # table not part of the schema
+
+            # index names are anonymized too (they share the namespace of tables)
+            counter = 1
+            new_idx = f"idx_{new_tbl}_{counter}"
+            while new_idx.lower() in taken:
+                counter += 1
+                new_idx = f"idx_{new_tbl}_{counter}"
+
+            if sql is not None:
+                # explicit CREATE INDEX, incl. expression and partial indexes
+                try:
+                    stmt = self.translate_sql(sql=sql, index_name=new_idx)
+                except Exception:
+                    print(f"[WARNING] Could not translate index {idx_name} of {self.db_id}")
+                    continue
+            else:
+                # automatic index of a UNIQUE constraint (primary keys are part of the CREATE TABLE)
+                origin = [row[3] for row in conn.execute(f'PRAGMA index_list("{tbl_name}");') if row[1] == idx_name]
+                cols = [row[2] for row in conn.execute(f'PRAGMA index_info("{idx_name}");')]
+                if origin != ["u"] or any(c is None or c.lower() not in self.mapping for c in cols):
+                    continue
+                new_cols = ", ".join(f'"{self.mapping[c.lower()]}"' for c in cols)
+                stmt = f'CREATE UNIQUE INDEX "{new_idx}" ON "{new_tbl}" ({new_cols});'
+
+            taken.add(new_idx.lower())
+            self.index_mapping[idx_name.lower()] = new_idx
+            stmts.append(stmt)
+            sources.append(idx_name)
+
+        conn.close()
+
+        self.index_stmts = stmts
+        self.index_sources = sources
+        return self.index_stmts
+
+    # check if original database has planner statistics
+    def has_statistics(self) -> bool:
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        found = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1';").fetchone() is not None
+        conn.close()
+        return found
+
     # create databases
     def create_new_sqlite_db(self):
 
@@ -237,6 +411,8 @@ class SchemaAnonymizer():
         conn = sqlite3.connect(self.db_path_new)
         cur = conn.cursor()
         
+        cur.execute(f"PRAGMA page_size = {self.profile.page_size};") # before the first table is created
+        self.profile.apply(conn)
         cur.execute("PRAGMA foreign_keys = OFF;") # disable FK checks while creating schema
 
         if not hasattr(self, "create_stmts"):
@@ -256,14 +432,257 @@ class SchemaAnonymizer():
 
         print(f"Created new SQLite database at {self.db_path_new}")
     
+    # clone original database file
+    def clone_database(self):
+
+        os.makedirs(os.path.dirname(self.db_path_new), exist_ok=True)
+        if os.path.exists(self.db_path_new):
+            os.remove(self.db_path_new)
+
+        method = clone_sqlite_file(self.db_path, self.db_path_new)
+        print(f"Cloned {self.db_path} → {self.db_path_new} ({method})")
+
+    # rename tables and columns of the cloned database according to mapping
+    # indexes get the names of sql_index_statements, planner statistics follow them,
+    # text is decoded like in copy mode, views and triggers are dropped (copy mode does not create them)
+    def rename_schema(self):
+
+        conn = sqlite3.connect(self.db_path_new, isolation_level=None)
+        conn.create_function("safe_decode", 1, safe_decode, deterministic=True)
+        conn.create_function("is_utf8", 1, is_utf8, deterministic=True)
+        cur = conn.cursor()
+
+        cur.execute("PRAGMA foreign_keys = OFF;")
+        cur.execute("PRAGMA legacy_alter_table = OFF;")
+        cur.execute("BEGIN;")
+
+        # planner statistics (tbl and idx columns hold original names), restored after the renames
+        stat_tables = [
+            name for (name,) in cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'sqlite_stat%';")
+        ]
+        stats = {stat_tbl: cur.execute(f"SELECT * FROM {stat_tbl};").fetchall() for stat_tbl in stat_tables}
+        auto_indexes = cur.execute("SELECT name, tbl_name FROM sqlite_master WHERE type='index' AND sql IS NULL;").fetchall()
+
+        # names and bodies of views and triggers keep original identifiers
+        for obj_type, obj_name in cur.execute("SELECT type, name FROM sqlite_master WHERE type IN ('trigger', 'view');").fetchall():
+            cur.execute(f'DROP {obj_type.upper()} IF EXISTS "{obj_name}";')
+
+        # explicit indexes are recreated with anonymized names below
+        for (idx_name,) in cur.execute("SELECT name FROM sqlite_master WHERE type='index' AND sql IS NOT NULL;").fetchall():
+            cur.execute(f'DROP INDEX "{idx_name}";')
+
+        # two phases via temporary names, so case-only renames and
+        # new names that equal another original name do not collide
+        tables = [(tbl_name, self.mapping[tbl_name.lower()]) for tbl_name in self.schema]
+        tables = [(old, new) for old, new in tables if old != new]
+        for i, (old_tbl, _) in enumerate(tables):
+            cur.execute(f'ALTER TABLE "{old_tbl}" RENAME TO "__anon_table_{i}";')
+        for i, (_, new_tbl) in enumerate(tables):
+            cur.execute(f'ALTER TABLE "__anon_table_{i}" RENAME TO "{new_tbl}";')
+
+        for tbl_name, tbl_info in self.schema.items():
+            new_tbl = self.mapping[tbl_name.lower()]
+            columns = [(col["name"], self.mapping[col["name"].lower()]) for col in tbl_info["columns"]]
+            columns = [(old, new) for old, new in columns if old != new]
+
+            for i, (old_col, _) in enumerate(columns):
+                cur.execute(f'ALTER TABLE "{new_tbl}" RENAME COLUMN "{old_col}" TO "__anon_column_{i}";')
+            for i, (_, new_col) in enumerate(columns):
+                cur.execute(f'ALTER TABLE "{new_tbl}" RENAME COLUMN "__anon_column_{i}" TO "{new_col}";')
+
+            # same values as copy mode: invalid UTF-8 text (and blobs) go through safe_decode
+            new_cols = [self.mapping[col["name"].lower()] for col in tbl_info["columns"]]
+            needs_decode = self.decode_columns(cur, new_tbl, new_cols, schema="main")
+            assignments = [
+                f'"{col}" = CASE WHEN typeof("{col}") IN (\'text\', \'blob\') '
+                f'THEN safe_decode(CAST("{col}" AS BLOB)) ELSE "{col}" END'
+                for col, decode in zip(new_cols, needs_decode) if decode
+            ]
+            if assignments:
+                cur.execute(f'UPDATE "{new_tbl}" SET {", ".join(assignments)};')
+
+        # explicit indexes from their translated CREATE INDEX statements,
+        # automatic indexes of constraints are renamed by sqlite along with their table
+        self.sql_index_statements()
+        for idx_name, stmt in zip(self.index_sources, self.index_stmts):
+            if not idx_name.lower().startswith("sqlite_autoindex_"):
+                cur.execute(stmt)
+        existing = {name for (name,) in cur.execute("SELECT name FROM sqlite_master WHERE type='index';")}
+        for idx_name, tbl_name in auto_indexes:
+            new_tbl = self.mapping.get(tbl_name.lower())
+            new_idx = f"sqlite_autoindex_{new_tbl}{idx_name[len(f'sqlite_autoindex_{tbl_name}'):]}"
+            if new_tbl is not None and new_idx in existing:
+                self.index_mapping[idx_name.lower()] = new_idx
+            else:
+                self.index_mapping.pop(idx_name.lower(), None)
+
+        # statistics of indexes that were not recreated are dropped
+        for stat_tbl, rows in stats.items():
+            cur.execute(f"DELETE FROM {stat_tbl};")
+            for tbl_name, idx_name, *values in rows:
+                new_tbl = self.mapping.get(tbl_name.lower()) if tbl_name is not None else None
+                new_idx = self.index_mapping.get(idx_name.lower()) if idx_name is not None else None
+                if new_tbl is None or (idx_name is not None and new_idx is None):
+                    continue
+                placeholders = ", ".join("?" * (len(values) + 2))
+                cur.execute(f"INSERT INTO {stat_tbl} VALUES ({placeholders});", (new_tbl, new_idx, *values))
+
+        cur.execute("COMMIT;")
+        cur.execute("PRAGMA foreign_keys = ON;")
+        conn.close()
+
+        print(f"Renamed {len(tables)} tables in {self.db_path_new}")
+
+    # compare schema of new database with the one copy mode creates, return mismatches
+    def verify_schema(self) -> List[str]:
+
+        if not hasattr(self, "create_stmts"):
+            self.sql_create_statements()
+
+        expected_conn = sqlite3.connect(":memory:")
+        for stmt in self.create_stmts + self.index_stmts:
+            expected_conn.execute(stmt)
+        expected = schema_signature(expected_conn)
+        expected_conn.close()
+
+        conn = sqlite3.connect(self.db_path_new)
+        conn.create_function("is_utf8", 1, is_utf8, deterministic=True)
+        actual = schema_signature(conn)
+
+        mismatches = []
+        for tbl_name in sorted(expected.keys() | actual.keys()):
+            if tbl_name not in actual:
+                mismatches.append(f"missing table {tbl_name}")
+            elif tbl_name not in expected:
+                mismatches.append(f"unexpected table {tbl_name}")
+            else:
+                for key in ("columns", "foreign_keys", "indexes"):
+                    if expected[tbl_name][key] != actual[tbl_name][key]:
+                        mismatches.append(f"{key} of {tbl_name} differ")
+
+        # no object may keep an original name
+        new_indexes = set(self.index_mapping.values())
+        for obj_type, obj_name, tbl_name in conn.execute(
+            "SELECT type, name, tbl_name FROM sqlite_master WHERE type IN ('index', 'trigger', 'view');"
+        ).fetchall():
+            if obj_type != "index":
+                mismatches.append(f"unexpected {obj_type} {obj_name}")
+            elif obj_name not in new_indexes and not obj_name.startswith(f"sqlite_autoindex_{tbl_name}_"):
+                mismatches.append(f"index {obj_name} of {tbl_name} not renamed")
+
+        # text must be decoded like in copy mode
+        for tbl_name, tbl_info in actual.items():
+            cols = [col[0] for col in tbl_info["columns"]]
+            for col, decode in zip(cols, self.decode_columns(conn, tbl_name, cols, schema="main")):
+                if decode:
+                    mismatches.append(f"undecoded text in {tbl_name}.{col}")
+
+        conn.close()
+        return mismatches
+
     # copy content
-    def copy_data(self):
+    # targets: anonymizers of other levels, filled from the rows of this one (original tables are read once)
+    def copy_data(self, engine:bool=True, chunk_size:int=COPY_CHUNK_SIZE, targets:List["SchemaAnonymizer"]=()):
+        if engine:
+            self.copy_data_engine(targets=targets)
+        elif targets:
+            raise ValueError("Copying to several levels requires the engine copy.")
+        else:
+            self.copy_data_stream(chunk_size=chunk_size)
+
+    # copy content inside SQLite (ATTACH + INSERT ... SELECT), rows never pass through python
+    def copy_data_engine(self, targets:List["SchemaAnonymizer"]=()):
+
+        print(f"Copying data from {self.db_path} → {self.db_path_new}")
+
+        new_conn = sqlite3.connect(self.db_path_new)
+        new_conn.create_function("safe_decode", 1, safe_decode, deterministic=True)
+        new_conn.create_function("is_utf8", 1, is_utf8, deterministic=True)
+        self.profile.apply(new_conn)
+        new_cur = new_conn.cursor()
+
+        # disable foreign key checks while inserting
+        new_cur.execute("PRAGMA foreign_keys = OFF;")
+        new_cur.execute("ATTACH DATABASE ? AS src;", (self.db_path,))
+        for i, target in enumerate(targets):
+            print(f"Copying data from {self.db_path} → {target.db_path_new}")
+            new_cur.execute(f"ATTACH DATABASE ? AS target_{i};", (target.db_path_new,))
+            self.profile.apply(new_conn, schema=f"target_{i}")
+
+        for tbl_name, tbl_info in self.schema.items():
+
+            old_tbl = tbl_name
+            new_tbl = self.mapping[tbl_name.lower()]
+
+            old_cols = [col["name"] for col in tbl_info["columns"]]
+            new_cols = [f'"{self.mapping[old_col.lower()]}"' for old_col in old_cols]
+
+            # same values as the python copy: invalid UTF-8 text (and blobs) go through safe_decode,
+            # only columns that actually hold such values pay for the function call
+            needs_decode = self.decode_columns(new_cur, old_tbl, old_cols)
+            select_cols = [
+                f'CASE WHEN typeof("{old_col}") IN (\'text\', \'blob\') '
+                f'THEN safe_decode(CAST("{old_col}" AS BLOB)) ELSE "{old_col}" END'
+                if decode else f'"{old_col}"'
+                for old_col, decode in zip(old_cols, needs_decode)
+            ]
+
+            # one transaction per table, rows keep the order (and rowids) of the original table
+            new_cur.execute(
+                f'INSERT INTO main."{new_tbl}" ({", ".join(new_cols)}) '
+                f'SELECT {", ".join(select_cols)} FROM src."{old_tbl}";'
+            )
+
+            # other levels copy the freshly written (decoded) table instead of reading the original again,
+            # in insertion order, so rows (and rowids) match a separate copy of the original
+            new_col_names = {self.mapping[old_col.lower()].lower() for old_col in old_cols}
+            rowid = next(alias for alias in ("rowid", "_rowid_", "oid") if alias not in new_col_names)
+            for i, target in enumerate(targets):
+                target_tbl = target.mapping[tbl_name.lower()]
+                target_cols = [f'"{target.mapping[old_col.lower()]}"' for old_col in old_cols]
+                new_cur.execute(
+                    f'INSERT INTO target_{i}."{target_tbl}" ({", ".join(target_cols)}) '
+                    f'SELECT {", ".join(new_cols)} FROM main."{new_tbl}" ORDER BY {rowid};'
+                )
+            new_conn.commit()
+
+        new_cur.execute("DETACH DATABASE src;")
+        for i in range(len(targets)):
+            new_cur.execute(f"DETACH DATABASE target_{i};")
+
+        # re-enable FK checks
+        new_cur.execute("PRAGMA foreign_keys = ON;")
+        new_conn.commit()
+
+        new_conn.close()
+
+    # columns of schema.tbl holding blobs or invalid UTF-8 text, one scan for all columns
+    # is_utf8 only runs on candidate text: multi-byte characters or NUL (byte and character length differ)
+    # or bytes SQLite reads as U+FFFD (lone lead bytes), pure ASCII text never leaves the engine
+    def decode_columns(self, cur, tbl:str, cols:List[str], schema:str="src") -> List[bool]:
+        if not cols:
+            return []
+        flags = [
+            f'''max(CASE typeof("{col}")
+                    WHEN 'blob' THEN 1
+                    WHEN 'text' THEN CASE
+                        WHEN length(CAST("{col}" AS BLOB)) != length("{col}") OR "{col}" GLOB '*' || char(65533) || '*'
+                        THEN NOT is_utf8(CAST("{col}" AS BLOB)) ELSE 0 END
+                    ELSE 0 END)'''
+            for col in cols
+        ]
+        row = cur.execute(f'SELECT {", ".join(flags)} FROM {schema}."{tbl}";').fetchone()
+        return [bool(flag) for flag in row]
+
+    # copy content through python (streamed in chunks, memory does not grow with table size)
+    def copy_data_stream(self, chunk_size:int=COPY_CHUNK_SIZE):
 
         print(f"Copying data from {self.db_path} → {self.db_path_new}")
 
         old_conn = sqlite3.connect(self.db_path)
         old_conn.text_factory = bytes # return TEXT as raw bytes to avoid encoding errors
         new_conn = sqlite3.connect(self.db_path_new)
+        self.profile.apply(new_conn)
 
         old_cur = old_conn.cursor()
         new_cur = new_conn.cursor()
@@ -291,12 +710,6 @@ class SchemaAnonymizer():
                 f'FROM "{old_tbl}";'
             )
 
-            rows = old_cur.execute(select_sql).fetchall()
-
-            if not rows:
-                # print(f"[INFO] Table {old_tbl}: 0 rows (skipped)")
-                continue
-
             placeholders = ", ".join(["?"] * len(col_pairs))
 
             insert_sql = (
@@ -304,11 +717,16 @@ class SchemaAnonymizer():
                 f'VALUES ({placeholders});'
             )
 
-            decoded_rows = [[safe_decode(v) for v in row] for row in rows]
-            new_cur.executemany(insert_sql, decoded_rows)
-            # print(f"[OK] Copied {len(rows)} rows into {new_tbl}")
+            old_cur.execute(select_sql)
+            while True:
+                rows = old_cur.fetchmany(chunk_size)
+                if not rows:
+                    break
 
-        new_conn.commit()
+                # decode lazily while inserting
+                new_cur.executemany(insert_sql, (tuple(safe_decode(v) for v in row) for row in rows))
+            new_conn.commit() # one transaction per table
+            # print(f"[OK] Copied rows into {new_tbl}")
 
         # re-enable FK checks
         new_cur.execute("PRAGMA foreign_keys = ON;")
@@ -317,23 +735,58 @@ class SchemaAnonymizer():
         old_conn.close()
         new_conn.close()
 
+    # create secondary indexes after the data is loaded (one sorted build instead of per-row updates)
+    def create_indexes(self):
+
+        if not self.index_stmts:
+            return
+
+        conn = sqlite3.connect(self.db_path_new)
+        self.profile.apply(conn)
+        for stmt in self.index_stmts:
+            try:
+                conn.execute(stmt)
+            except sqlite3.Error as e: # missing index only costs speed
+                print(f"[WARNING] Could not create index in {self.db_path_new}: {stmt} ({e})")
+        conn.commit()
+        conn.close()
+
+    # collect planner statistics
+    def analyze_database(self):
+        conn = sqlite3.connect(self.db_path_new)
+        self.profile.apply(conn)
+        conn.execute("ANALYZE;")
+        conn.commit()
+        conn.close()
+
+    # rebuild file without free pages
+    def vacuum_database(self):
+        conn = sqlite3.connect(self.db_path_new)
+        self.profile.apply(conn)
+        conn.execute("VACUUM;")
+        conn.close()
+
 
 
     #
     # recreate samples (query-question pairs)
     #
 
-    def recreate_samples(self):
+    # sql_cache (SQLParseCache): parse every query once for all levels instead of per translation
+    def recreate_samples(self, sql_cache=None):
 
         if len(self.samples) == 0: # no samples in current set
             return []
 
         self.dev_new = [] # reset
 
-        for sample in self.samples:
-            sql = sample.get("SQL") or sample.get("query")
-            sql_new = self.translate_sql(sql=sql)
+        sqls = [sample.get("SQL") or sample.get("query") for sample in self.samples]
+        if sql_cache is not None:
+            translated = [query.translate(self.mapping) for query in sql_cache.parse_many(sqls)]
+        else:
+            translated = [self.translate_sql(sql=sql) for sql in sqls]
 
+        for sample, sql_new in zip(self.samples, translated):
             self.dev_new.append({
                 "db_id": sample["db_id"],
                 "question": sample["question"],
@@ -342,81 +795,191 @@ class SchemaAnonymizer():
         
         return self.dev_new
 
-    # rewrite sql
-    def translate_sql(self, sql: str) -> str:
+    # compare EXPLAIN QUERY PLAN of original and rewritten queries, return differing samples
+    def plan_parity(self) -> List[Dict[str, Any]]:
+
+        if not self.dev_new:
+            self.recreate_samples()
+
+        # names in original plans expressed in the new schema
+        renames = {**self.mapping, **self.index_mapping}
+        names_regex = re.compile(
+            r"\b(" + "|".join(re.escape(name) for name in sorted(renames, key=len, reverse=True)) + r")\b",
+            re.IGNORECASE
+        )
+
+        def normalize(plan: List[str], translate: bool) -> List[str]:
+            normalized = []
+            for detail in plan:
+                detail = re.sub(r"sqlite_autoindex_\S+", "sqlite_autoindex", detail) # numbered per table
+                if translate and renames:
+                    detail = names_regex.sub(lambda m: renames[m.group(0).lower()], detail)
+                normalized.append(detail)
+            return normalized
+
+        differing = []
+        for sample, sample_new in zip(self.samples, self.dev_new):
+            sql = sample.get("SQL") or sample.get("query")
+            plan = query_plan(sql, self.db_path)
+            plan_new = query_plan(sample_new["query"], self.db_path_new)
+
+            if plan is None or plan_new is None or normalize(plan, True) != normalize(plan_new, False):
+                differing.append({"query": sql, "query_new": sample_new["query"], "plan": plan, "plan_new": plan_new})
 
-        # parse SQL into AST
-        try:
-            ast = sqlglot.parse_one(sql, read="sqlite")
-        except Exception as e:
-            print(sql)
-            raise Exception(e)
-
-        mapping = self.mapping
-
-        def lookup(name: str):
-            # case-insensitive lookup in mapping (keys are lowercase)
-            if not isinstance(name, str):
-                return None
-            return mapping.get(name.lower())
-
-        def _transform(node):
-
-            # table names
-            if isinstance(node, exp.Table):
-                # name is always a string table name (or None)
-                old_name = node.name
-                new_name = lookup(old_name)
-                if new_name:
-                    # set underlying identifier to the new name
-                    node.set("this", exp.to_identifier(new_name))
-                return node
-
-            # column names
-            if isinstance(node, exp.Column):
-                # Unqualified column name
-                col_name = node.name  # string or None
-                new_col = lookup(col_name)
-                if new_col:
-                    node.set("this", exp.to_identifier(new_col))
-
-                # table qualifier, e.g. table.column or alias.column
-                # usually an identifier or sometimes a string
-                tbl_expr = node.args.get("table")
-                if isinstance(tbl_expr, exp.Identifier):
-                    tbl_name = tbl_expr.this
-                    new_tbl = lookup(tbl_name)
-                    if new_tbl:
-                        tbl_expr.set("this", new_tbl)
-                elif isinstance(tbl_expr, str):
-                    new_tbl = lookup(tbl_expr)
-                    if new_tbl:
-                        node.set("table", new_tbl)
-
-                return node
-
-            # generic identifiers
-            # this catches things like stand-alone identifiers, wildcards in some contexts, etc.
-            if isinstance(node, exp.Identifier):
-                old = node.this
-                if isinstance(old, str):
-                    new = lookup(old)
-                    if new:
-                        node.set("this", new)
-                return node
+        return differing
+
+    # rewrite sql, index_name renames the index of a CREATE INDEX statement
+    def translate_sql(self, sql: str, index_name: str = None) -> str:
+        return translate_sql_ast(sql, self.mapping, index_name=index_name)
+
+
+# rewrite sql through mapping (keys are lowercase) on the sqlglot AST
+# index_name renames the index of a CREATE INDEX statement
+def translate_sql_ast(sql: str, mapping: Dict[str, str], index_name: str = None) -> str:
+    import sqlglot # heavy, only needed for sample rewriting
+    from sqlglot import exp
+
+    # parse SQL into AST
+    try:
+        ast = sqlglot.parse_one(sql, read="sqlite")
+    except Exception as e:
+        print(sql)
+        raise Exception(e)
 
+    def lookup(name: str):
+        # case-insensitive lookup in mapping (keys are lowercase)
+        if not isinstance(name, str):
+            return None
+        return mapping.get(name.lower())
+
+    def _transform(node):
+
+        # table names
+        if isinstance(node, exp.Table):
+            # name is always a string table name (or None)
+            old_name = node.name
+            new_name = lookup(old_name)
+            if new_name:
+                # set underlying identifier to the new name
+                node.set("this", exp.to_identifier(new_name))
             return node
 
-        new_ast = ast.transform(_transform)
+        # column names
+        if isinstance(node, exp.Column):
+            # Unqualified column name
+            col_name = node.name  # string or None
+            new_col = lookup(col_name)
+            if new_col:
+                node.set("this", exp.to_identifier(new_col))
+
+            # table qualifier, e.g. table.column or alias.column
+            # usually an identifier or sometimes a string
+            tbl_expr = node.args.get("table")
+            if isinstance(tbl_expr, exp.Identifier):
+                tbl_name = tbl_expr.this
+                new_tbl = lookup(tbl_name)
+                if new_tbl:
+                    tbl_expr.set("this", new_tbl)
+            elif isinstance(tbl_expr, str):
+                new_tbl = lookup(tbl_expr)
+                if new_tbl:
+                    node.set("table", new_tbl)
 
-        try:
-            rewritten_sql = new_ast.sql(dialect="sqlite")            
-        except Exception as e:
-            print(f"[WARNING] Could not serialize AST for SQL: {sql}")
-            raise Exception(e)
+            return node
+
+        # generic identifiers
+        # this catches things like stand-alone identifiers, wildcards in some contexts, etc.
+        if isinstance(node, exp.Identifier):
+            old = node.this
+            if isinstance(old, str):
+                new = lookup(old)
+                if new:
+                    node.set("this", new)
+            return node
+
+        return node
+
+    new_ast = ast.transform(_transform)
+
+    if index_name is not None and isinstance(new_ast.this, exp.Index):
+        new_ast.this.set("this", exp.to_identifier(index_name))
 
-        return rewritten_sql
+    try:
+        rewritten_sql = new_ast.sql(dialect="sqlite")            
+    except Exception as e:
+        print(f"[WARNING] Could not serialize AST for SQL: {sql}")
+        raise Exception(e)
 
+    return rewritten_sql
+
+# profile name or BulkLoadProfile -> BulkLoadProfile
+def resolve_profile(profile:Union[str, BulkLoadProfile]) -> BulkLoadProfile:
+    if isinstance(profile, str):
+        if profile not in BULK_LOAD_PROFILES:
+            raise ValueError(f"Unknown bulk load profile: {profile}")
+        profile = BULK_LOAD_PROFILES[profile]
+    return profile
+
+# copy database file: reflink clone, kernel side copy or VACUUM INTO, return method used
+def clone_sqlite_file(src:str, dst:str) -> str:
+
+    # a pending wal/journal is only consistent through sqlite itself
+    if not any(os.path.exists(src + suffix) for suffix in ("-wal", "-journal")):
+        with open(src, "rb") as f_src, open(dst, "wb") as f_dst:
+            try:
+                import fcntl # unix only
+                fcntl.ioctl(f_dst.fileno(), FICLONE, f_src.fileno())
+                return "reflink"
+            except (ImportError, OSError):
+                pass
+
+            try:
+                remaining = os.fstat(f_src.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(f_src.fileno(), f_dst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                if remaining == 0:
+                    return "copy_file_range"
+            except (AttributeError, OSError):
+                pass # not supported by platform or filesystem
+
+        os.remove(dst)
+
+    conn = sqlite3.connect(f"file:{src}?mode=ro", uri=True)
+    conn.execute("VACUUM INTO ?;", (dst,))
+    conn.close()
+    return "vacuum"
+
+# tables with their columns (name, type, notnull, pk) and explicit foreign keys
+def schema_signature(conn) -> dict:
+    signature = {}
+    tables = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';").fetchall()
+    for (tbl_name,) in tables:
+        columns = conn.execute(f'PRAGMA table_info("{tbl_name}");').fetchall()
+        fks = conn.execute(f'PRAGMA foreign_key_list("{tbl_name}");').fetchall()
+        signature[tbl_name] = {
+            "columns": [(name, ctype, bool(notnull), pk > 0) for _, name, ctype, notnull, _, pk in columns],
+            "foreign_keys": sorted((fk[2], fk[3], fk[4]) for fk in fks if fk[4] is not None), # implicit pk references are not recreated
+            # index definitions independent of their names (unique constraints are plain unique indexes in copy mode)
+            "indexes": sorted(
+                (bool(unique), bool(partial), tuple(
+                    (cid, name, desc, coll) for _, cid, name, desc, coll, key in conn.execute(f'PRAGMA index_xinfo("{idx_name}");') if key
+                ))
+                for _, idx_name, unique, _, partial in conn.execute(f'PRAGMA index_list("{tbl_name}");')
+            )
+        }
+    return signature
+
+# check raw text bytes
+def is_utf8(x):
+    if isinstance(x, bytes):
+        try:
+            x.decode("utf-8")
+        except UnicodeDecodeError:
+            return False
+    return True
 
 # decoding column values
 def safe_decode(x):
@@ -12,14 +12,16 @@ class SchemaBuilder:
     """
 
 
-    def __init__(self, dataset:str="spider", db_id:str=None, level:str=None):
+    def __init__(self, dataset:str="spider", db_id:str=None, level:str=None, db_path:str=None):
 
         self.dataset = dataset
         self.db_id = db_id
         self.level = None
         self.reset()
         
-        if level and level != "L0":
+        if db_path:
+            self.db_path = db_path # score or describe an arbitrary sqlite file
+        elif level and level != "L0":
             self.db_path = f"data/datasets/{dataset}_{level}/database/{db_id}/{db_id}.sqlite"
         elif dataset == "spider":
             self.db_path = f"{SPIDER_DATABASE_PATH}{db_id}/{db_id}.sqlite"
@@ -201,46 +203,50 @@ class SchemaBuilder:
 
         if not self.schema_object:
             raise RuntimeError("Schema object is not populated!")
-        
-        foreign_keys = []
 
-        # db_id
-        schema_string = f"## Database Name: {self.schema_object['db_id']} \n\n"
+        return generate_schema_string(self.schema_object)
 
-        # schema
-        schema_string += "## Database Schema \n\n"
 
-        # tables with columns
-        for table_name, table_object in self.schema_object["schema"].items():
+# utilities
 
-            schema_string += f"# Table: {table_name}\n[\n"
-            
-            for column_object in table_object["columns"]:
-                schema_string += f"({column_object['name']}: {column_object['type'].upper()},"
-                if column_object['pk'] == 1:
-                    schema_string += " PRIMARY KEY,"
-                if not column_object['notnull']:
-                    schema_string += " NOT NULL"                
-                schema_string += "),\n"
-            schema_string += "]\n\n"
-
-            for fk in table_object.get("foreign_keys", []):
-                # foreign key column on this table
-                fk_identifier = f"{table_name}.{fk['targetColumn']}"
-                # PK it references:
-                pk_identifier = f"{fk['sourceTable']}.{fk['sourceColumn']}"
-                foreign_keys.append((fk_identifier, pk_identifier))
-        
-        # foreign keys
-        if foreign_keys:
-            schema_string += "## Foreign Keys \n"
-            for fk_identifier, pk_identifier in foreign_keys:
-                schema_string += f"{fk_identifier} REFERENCES {pk_identifier}\n"
+def generate_schema_string(schema_object: dict) -> str:
+    foreign_keys = []
 
-        return schema_string
+    # db_id
+    schema_string = f"## Database Name: {schema_object['db_id']} \n\n"
 
+    # schema
+    schema_string += "## Database Schema \n\n"
+
+    # tables with columns
+    for table_name, table_object in schema_object["schema"].items():
+
+        schema_string += f"# Table: {table_name}\n[\n"
+        
+        for column_object in table_object["columns"]:
+            schema_string += f"({column_object['name']}: {column_object['type'].upper()},"
+            if column_object['pk'] == 1:
+                schema_string += " PRIMARY KEY,"
+            if not column_object['notnull']:
+                schema_string += " NOT NULL"                
+            schema_string += "),\n"
+        schema_string += "]\n\n"
+
+        for fk in table_object.get("foreign_keys", []):
+            # foreign key column on this table
+            fk_identifier = f"{table_name}.{fk['targetColumn']}"
+            # PK it references:
+            pk_identifier = f"{fk['sourceTable']}.{fk['sourceColumn']}"
+            foreign_keys.append((fk_identifier, pk_identifier))
+    
+    # foreign keys
+    if foreign_keys:
+        schema_string += "## Foreign Keys \n"
+        for fk_identifier, pk_identifier in foreign_keys:
+            schema_string += f"{fk_identifier} REFERENCES {pk_identifier}\n"
+
+    return schema_string
 
-# utilities
 
 def to_dict(cursor: sqlite3.Cursor):
     
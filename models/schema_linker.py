@@ -0,0 +1,190 @@
+import os
+import re
+import numpy as np
+from typing import Dict, Any, Callable, List, Tuple
+
+from models.faiss_index import normalize_vectors
+from models.schema_builder import generate_schema_string
+from models.sas_store import schema_hash
+from utils.vocab import get_word_vectors
+from utils.hashing import fingerprint
+from configs.paths import CACHE_PATH
+
+SCHEMA_LINKING_CACHE_PATH = f"{CACHE_PATH}schema_linking/"
+QUESTION_TOKEN_REGEX = re.compile(r"[A-Za-z]+|\d+")
+STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "at", "to", "for", "by", "with", "from", "and", "or",
+    "is", "are", "was", "were", "be", "been", "do", "does", "did", "what", "which", "who",
+    "whom", "whose", "how", "many", "much", "list", "show", "give", "find", "return", "all",
+    "each", "every", "that", "this", "these", "those", "there", "their", "it", "its", "as",
+    "than", "me", "please"
+}
+
+
+class SchemaLinker:
+    """
+    Embedding-based schema pruning for prompts
+    Tables and columns are ranked by the cosine similarity of their name
+    embedding to the question tokens, the pruned schema keeps key columns
+    and the foreign key closure of all kept tables.
+    Name embeddings are computed once per database and cached on disk.
+    """
+
+    def __init__(
+        self,
+        embedding_model,
+        tokenizer: Callable[[str], List[str]],
+        model_fingerprint: str = "",
+        max_tables: int = 5,
+        max_columns: int = 10,
+        cache_path: str = SCHEMA_LINKING_CACHE_PATH
+    ):
+        # embedding_model: fastText model or SubwordEmbedding
+        # tokenizer: function that converts name -> list of tokens
+        # model_fingerprint: identifies the embeddings the cached name vectors were computed with
+        # max_tables: number of top ranked tables to keep (before foreign key closure)
+        # max_columns: number of top ranked non-key columns to keep per table
+        # cache_path: directory holding per-database name embeddings (None disables the disk cache)
+
+        self.embedding_model = embedding_model
+        self.tokenizer = tokenizer
+        self.model_fingerprint = model_fingerprint
+        self.max_tables = max_tables
+        self.max_columns = max_columns
+        self.cache_path = cache_path
+        self.schemas = {}
+        self.question_token_vectors = {} # question vocabularies are small and repeat across questions
+
+    def prepare(self, schema_object: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Return (cached) name embeddings of one schema:
+        names = [(table, None), (table, column), ...] and their (N, D) unit vectors
+        """
+        s_hash = fingerprint(schema_hash(schema_object), self.model_fingerprint)
+        key = (schema_object.get("dataset"), schema_object["db_id"])
+        if key in self.schemas and self.schemas[key]["hash"] == s_hash:
+            return self.schemas[key]
+
+        names = []
+        for table_name, table_object in schema_object["schema"].items():
+            names.append((table_name, None))
+            names.extend((table_name, col["name"]) for col in table_object["columns"])
+
+        vectors = None
+        file_path = None
+        if self.cache_path:
+            file_path = os.path.join(self.cache_path, f"{key[0]}_{key[1]}_{s_hash[:16]}.npz") # levels of a database get their own file
+            if os.path.exists(file_path):
+                cached = np.load(file_path)
+                if str(cached["hash"]) == s_hash:
+                    vectors = cached["vectors"]
+
+        if vectors is None:
+            vectors = self._name_vectors([column or table for table, column in names])
+            if file_path:
+                os.makedirs(self.cache_path, exist_ok=True)
+                np.savez(file_path, hash=s_hash, vectors=vectors)
+
+        self.schemas[key] = {"hash": s_hash, "names": names, "vectors": vectors}
+        return self.schemas[key]
+
+    def rank(self, schema_object: Dict[str, Any], question: str) -> Dict[Tuple[str, str], float]:
+        """
+        Return {(table, column or None): similarity} for all schema objects
+        """
+        prepared = self.prepare(schema_object)
+        question_vectors = self._question_vectors(question_tokens(question))
+        if len(question_vectors) == 0:
+            return {name: 0.0 for name in prepared["names"]}
+
+        # best matching question token per schema name
+        scores = (prepared["vectors"] @ question_vectors.T).max(axis=1)
+        return dict(zip(prepared["names"], scores.tolist()))
+
+    def prune(self, schema_object: Dict[str, Any], question: str) -> Dict[str, Any]:
+        """
+        Return a schema object reduced to the tables and columns relevant for question
+        """
+        scores = self.rank(schema_object, question)
+        schema_dict = schema_object["schema"]
+        table_lookup = {table_name.lower(): table_name for table_name in schema_dict}
+
+        # table relevance = best score of its name or any of its columns
+        table_scores = {}
+        for (table_name, _), score in scores.items():
+            table_scores[table_name] = max(table_scores.get(table_name, -1.0), score)
+        ranked_tables = sorted(schema_dict, key=lambda t: -table_scores[t])
+        kept_tables = set(ranked_tables[:self.max_tables])
+
+        # foreign key closure, every kept reference points to a kept table
+        kept_columns = {table_name: set() for table_name in schema_dict}
+        stack = list(kept_tables)
+        while stack:
+            table_name = stack.pop()
+            for fk in schema_dict[table_name].get("foreign_keys", []):
+                source_table = table_lookup.get(fk["sourceTable"].lower())
+                if source_table is None:
+                    continue
+                kept_columns[table_name].add((fk["targetColumn"] or "").lower())
+                kept_columns[source_table].add((fk["sourceColumn"] or "").lower()) # None = implicit primary key
+                if source_table not in kept_tables:
+                    kept_tables.add(source_table)
+                    stack.append(source_table)
+
+        # columns: keys first, then the best ranked ones
+        pruned = {"dataset": schema_object.get("dataset"), "db_id": schema_object["db_id"], "schema": {}}
+        for table_name in ranked_tables:
+            if table_name not in kept_tables:
+                continue
+            table_object = schema_dict[table_name]
+            keys = kept_columns[table_name] | {pk.lower() for pk in table_object.get("primary_keys", [])}
+            ranked_columns = sorted(
+                (col for col in table_object["columns"] if col["name"].lower() not in keys),
+                key=lambda col: -scores[(table_name, col["name"])]
+            )
+            keep = keys | {col["name"].lower() for col in ranked_columns[:self.max_columns]}
+
+            pruned["schema"][table_name] = {
+                "columns": [col for col in table_object["columns"] if col["name"].lower() in keep], # original order
+                "primary_keys": table_object.get("primary_keys", []),
+                "foreign_keys": [
+                    fk for fk in table_object.get("foreign_keys", [])
+                    if table_lookup.get(fk["sourceTable"].lower()) in kept_tables
+                ]
+            }
+        return pruned
+
+    def pruned_schema_string(self, schema_object: Dict[str, Any], question: str) -> str:
+        return generate_schema_string(self.prune(schema_object, question))
+
+    def _question_vectors(self, tokens: List[str]) -> np.ndarray:
+        missing = [t for t in tokens if t not in self.question_token_vectors]
+        if missing:
+            self.question_token_vectors.update(zip(missing, self._token_vectors(missing)))
+        if not tokens:
+            return self._token_vectors([])
+        return np.stack([self.question_token_vectors[t] for t in tokens])
+
+    def _token_vectors(self, tokens: List[str]) -> np.ndarray:
+        if not tokens:
+            return np.zeros((0, self.embedding_model.get_dimension()), dtype=np.float32)
+        return normalize_vectors(get_word_vectors(self.embedding_model, tokens))
+
+    def _name_vectors(self, names: List[str]) -> np.ndarray:
+        # name embedding = normalized mean of its normalized token embeddings
+        name_tokens = [[t for t in self.tokenizer(name) if not t.isnumeric()] for name in names]
+        unique_tokens = sorted({t for tokens in name_tokens for t in tokens})
+        token_idx = {t: i for i, t in enumerate(unique_tokens)}
+        token_vectors = self._token_vectors(unique_tokens)
+
+        vectors = np.zeros((len(names), self.embedding_model.get_dimension()), dtype=np.float32)
+        for i, tokens in enumerate(name_tokens):
+            if tokens:
+                vectors[i] = token_vectors[[token_idx[t] for t in tokens]].mean(axis=0)
+        return normalize_vectors(vectors)
+
+
+def question_tokens(question: str) -> List[str]:
+    # lowercase word tokens of a question without stopwords
+    tokens = [t.lower() for t in QUESTION_TOKEN_REGEX.findall(question)]
+    return list(dict.fromkeys(t for t in tokens if t not in STOPWORDS and not t.isnumeric()))
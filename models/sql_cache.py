@@ -0,0 +1,163 @@
+import os
+import json
+import sqlite3
+from typing import Dict, List
+
+from utils.hashing import fingerprint
+from configs.paths import CACHE_PATH
+
+SQL_CACHE_PATH = f"{CACHE_PATH}parsed_sql.sqlite"
+
+# roles of identifiers in SchemaAnonymizer.translate_sql
+NAME = "name" # Table.this / Column.this: replaced by a new identifier, mapped twice
+QUALIFIER = "qualifier" # Column.table: renamed in place, mapped twice
+PLAIN = "plain" # any other identifier (aliases, ...): mapped once
+
+
+class ParsedQuery:
+    """
+    Gold query parsed once, translated for any number of mappings
+    Identifiers are collected once with their role in SchemaAnonymizer.translate_sql,
+    translate() renames them in place, serializes the AST and restores
+    the original names, so no parse or tree copy is needed per level.
+    """
+
+    def __init__(self, ast):
+        from sqlglot import exp
+
+        self.ast = ast
+        self.identifiers = []
+        for ident in ast.find_all(exp.Identifier):
+            if not isinstance(ident.this, str):
+                continue
+            parent, arg_key = ident.parent, ident.arg_key
+            if isinstance(parent, (exp.Table, exp.Column)) and arg_key == "this":
+                role = NAME
+            elif isinstance(parent, exp.Column) and arg_key == "table":
+                role = QUALIFIER
+            else:
+                role = PLAIN
+            self.identifiers.append((ident, role, ident.this, ident.quoted))
+
+    def translate(self, mapping: Dict[str, str]) -> str:
+        """
+        Same result as SchemaAnonymizer.translate_sql with mapping (keys are lowercase)
+        """
+        from sqlglot import exp
+
+        try:
+            for ident, role, name, quoted in self.identifiers:
+                new_name = mapping.get(name.lower())
+                if not new_name:
+                    continue
+
+                if role == NAME:
+                    # translate_sql sets exp.to_identifier(new_name), quoted only if needed
+                    ident.set("quoted", exp.to_identifier(new_name).quoted)
+                if role != PLAIN:
+                    # the new identifier is visited again by the transform
+                    new_name = mapping.get(new_name.lower()) or new_name
+                ident.set("this", new_name)
+
+            return self.ast.sql(dialect="sqlite")
+        finally:
+            for ident, _, name, quoted in self.identifiers:
+                ident.set("this", name)
+                ident.set("quoted", quoted)
+
+
+class SQLParseCache:
+    """
+    Persistent cache of parsed SQL (sqlglot, sqlite dialect)
+    ASTs are stored serialized (sqlglot.serde) and keyed by the sqlglot
+    version, parsed queries are kept in memory, so every query of a
+    dataset is parsed once for all levels and runs.
+    """
+
+    def __init__(self, path: str = SQL_CACHE_PATH):
+        # path: SQLite file holding the serialized ASTs (None keeps the cache in memory only)
+        import sqlglot
+
+        self.fingerprint = fingerprint("sqlite", sqlglot.__version__)
+        self.path = path
+        self.parsed = {}
+        self.parses = 0
+
+        self.conn = None
+        if self.path:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.conn = sqlite3.connect(self.path, timeout=60) # wait for concurrent writers
+            self.conn.execute("PRAGMA journal_mode = WAL;") # readers do not block the writer
+            self.conn.execute(
+                """ CREATE TABLE IF NOT EXISTS parsed_sql (
+                        fingerprint TEXT NOT NULL,
+                        sql TEXT NOT NULL,
+                        ast TEXT NOT NULL,
+                        PRIMARY KEY (fingerprint, sql)
+                    ) WITHOUT ROWID;
+                """
+            )
+            self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+        self.conn = None
+
+    def parse_many(self, sqls: List[str], strict: bool = True) -> List[ParsedQuery]:
+        """
+        Return a ParsedQuery per sql, only queries never seen before are parsed
+        invalid SQL raises like sqlglot.parse_one (strict) or returns None
+        """
+        import sqlglot
+        from sqlglot import serde
+
+        missing = list(dict.fromkeys(sql for sql in sqls if sql not in self.parsed))
+
+        # SQLite second (chunked to stay below the variable limit)
+        if self.conn:
+            for i in range(0, len(missing), 500):
+                chunk = missing[i:i + 500]
+                placeholders = ", ".join(["?"] * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT sql, ast FROM parsed_sql WHERE fingerprint = ? AND sql IN ({placeholders});",
+                    [self.fingerprint, *chunk]
+                ).fetchall()
+                for sql, ast in rows:
+                    self.parsed[sql] = ParsedQuery(serde.load(json.loads(ast)))
+
+        new_rows = []
+        for sql in missing:
+            if sql in self.parsed:
+                continue
+            self.parses += 1
+            try:
+                ast = sqlglot.parse_one(sql, read="sqlite")
+            except Exception:
+                if strict:
+                    raise
+                continue
+            new_rows.append((self.fingerprint, sql, json.dumps(serde.dump(ast))))
+            self.parsed[sql] = ParsedQuery(ast)
+
+        if self.conn and new_rows:
+            self.conn.executemany("INSERT OR REPLACE INTO parsed_sql (fingerprint, sql, ast) VALUES (?, ?, ?);", new_rows)
+            self.conn.commit()
+
+        return [self.parsed.get(sql) for sql in sqls]
+
+    def prune(self) -> int:
+        """
+        Delete entries of other sqlglot versions, returns number of removed rows
+        """
+        if not self.conn:
+            return 0
+        cur = self.conn.execute("DELETE FROM parsed_sql WHERE fingerprint != ?;", (self.fingerprint,))
+        self.conn.commit()
+        return cur.rowcount
@@ -0,0 +1,79 @@
+import re
+from typing import Dict
+
+from models.schema_anonymizer import translate_sql_ast
+
+SAFE_IDENTIFIER_REGEX = re.compile(r"^[_a-zA-Z][\w]*$")
+
+
+class SQLRewriter:
+    """
+    Fast identifier rewriting for large query logs
+    Queries are tokenized once (sqlglot tokenizer, sqlite dialect) and
+    identifier tokens are renamed in the original text. Queries the
+    token stream cannot resolve unambiguously are rewritten on the AST
+    (translate_sql_ast), so results equal SchemaAnonymizer.translate_sql.
+    """
+
+    def __init__(self, mapping: Dict[str, str]):
+        # mapping: old name (lowercase) -> new name, see SchemaAnonymizer.generate_mapping()
+        from sqlglot.dialects.sqlite import SQLite
+        from sqlglot.tokens import TokenType
+
+        self.mapping = mapping
+        self.dialect = SQLite()
+        self.var = TokenType.VAR # unquoted identifier
+        self.identifier_types = {TokenType.VAR, TokenType.IDENTIFIER}
+        self.literal_types = {TokenType.NUMBER} | {t for t in TokenType if t.name.endswith("STRING")}
+        self.l_paren = TokenType.L_PAREN
+        self.collate = TokenType.COLLATE
+
+        # the AST path maps table and column names twice but aliases once,
+        # names whose new name is mapped again depend on their role
+        self.chained = {
+            old for old, new in mapping.items()
+            if new.lower() in mapping and mapping[new.lower()] != new
+        }
+
+        self.token_rewrites = 0
+        self.fallbacks = 0
+
+    def rewrite(self, sql: str) -> str:
+        new_sql = self.rewrite_tokens(sql)
+        if new_sql is None:
+            self.fallbacks += 1
+            return translate_sql_ast(sql, self.mapping)
+        self.token_rewrites += 1
+        return new_sql
+
+    def rewrite_tokens(self, sql: str) -> str:
+        """
+        Return sql with renamed identifier tokens, None if the AST is needed
+        """
+        tokens = self.dialect.tokenize(sql)
+
+        parts = []
+        last = 0
+        for i, token in enumerate(tokens):
+            new_name = self.mapping.get(token.text.lower())
+            if new_name is None:
+                continue
+
+            if token.token_type in self.literal_types:
+                continue
+            if token.token_type not in self.identifier_types:
+                return None # keyword that may be parsed as identifier (e.g. date, first)
+            if i > 0 and tokens[i - 1].token_type == self.collate:
+                continue # collation names are no identifiers
+            if i + 1 < len(tokens) and tokens[i + 1].token_type == self.l_paren:
+                return None # function name or table with column list
+            if token.text.lower() in self.chained:
+                return None
+
+            quoted = token.token_type != self.var or not SAFE_IDENTIFIER_REGEX.match(new_name)
+            parts.append(sql[last:token.start])
+            parts.append('"' + new_name.replace('"', '""') + '"' if quoted else new_name)
+            last = token.end + 1
+
+        parts.append(sql[last:])
+        return "".join(parts)
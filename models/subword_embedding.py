@@ -0,0 +1,245 @@
+import os
+import json
+import numpy as np
+from typing import List
+
+from utils.hashing import file_fingerprint, fingerprint
+
+# artifact file names (see export_fasttext_model)
+MATRIX_FILE = "input_matrix.npy"
+WORDS_BLOB_FILE = "words_blob.npy"
+WORDS_OFFSETS_FILE = "words_offsets.npy"
+WORDS_HASH_FILE = "words_hash_sorted.npy"
+WORDS_ORDER_FILE = "words_hash_order.npy"
+META_FILE = "meta.json"
+
+# fastText constants
+BOW = "<"
+EOW = ">"
+EOS = "</s>"
+FNV_OFFSET = np.uint32(2166136261)
+FNV_PRIME = np.uint32(16777619)
+
+
+class SubwordEmbedding:
+    """
+    fastText-compatible word vectors without fastText
+    Memory-maps the exported input matrix and vocabulary and computes
+    subword n-gram hashing and averaging in NumPy, in batches.
+    Drop-in for the get_words / get_dimension / get_word_vector
+    subset of a loaded fastText model.
+    """
+
+    def __init__(self, path: str, mmap: bool = True, batch_size: int = 10000):
+        # path: directory written by export_fasttext_model()
+        # mmap: memory-map the matrix instead of reading it into RAM
+        # batch_size: number of words gathered per NumPy batch
+
+        with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        mmap_mode = "r" if mmap else None
+        self.matrix = np.load(os.path.join(path, MATRIX_FILE), mmap_mode=mmap_mode)
+        self.words_blob = np.load(os.path.join(path, WORDS_BLOB_FILE), mmap_mode=mmap_mode)
+        self.words_offsets = np.load(os.path.join(path, WORDS_OFFSETS_FILE), mmap_mode=mmap_mode)
+        self.words_hash = np.load(os.path.join(path, WORDS_HASH_FILE), mmap_mode=mmap_mode)
+        self.words_order = np.load(os.path.join(path, WORDS_ORDER_FILE), mmap_mode=mmap_mode)
+
+        self.nwords = self.meta["nwords"]
+        self.minn = self.meta["minn"]
+        self.maxn = self.meta["maxn"]
+        self.bucket = self.meta["bucket"]
+        self.dim = self.meta["dim"]
+        self.model_fingerprint = self.meta["model_fingerprint"] # fingerprint of the exported .bin file
+        self.dtype = self.meta.get("dtype", "float32")
+        # reduced precision changes vectors and therefore every derived cache and artifact
+        self.fingerprint = self.model_fingerprint if self.dtype == "float32" else fingerprint(self.model_fingerprint, self.dtype)
+        self.batch_size = batch_size
+
+    def get_dimension(self) -> int:
+        return self.dim
+
+    def get_words(self, include_freq: bool = False) -> List[str]:
+        if include_freq:
+            raise ValueError("Word frequencies are not exported.")
+        return [self._word(i) for i in range(self.nwords)]
+
+    def get_word_id(self, word: str) -> int:
+        return int(self._word_ids([word])[0])
+
+    def get_word_vector(self, word: str) -> np.ndarray:
+        return self.get_word_vectors([word])[0]
+
+    def get_word_vectors(self, words: List[str]) -> np.ndarray:
+        """
+        Return (N, D) float32 matrix of fastText word vectors
+        """
+        vectors = np.zeros((len(words), self.dim), dtype=np.float32)
+        for start in range(0, len(words), self.batch_size):
+            batch = words[start:start + self.batch_size]
+            vectors[start:start + len(batch)] = self._batch_vectors(batch)
+        return vectors
+
+    def _batch_vectors(self, words: List[str]) -> np.ndarray:
+        word_ids = self._word_ids(words)
+
+        # collect n-grams of all words, remember owner of every n-gram
+        ngrams = []
+        ngram_owner = []
+        for i, word in enumerate(words):
+            if word == EOS:
+                continue
+            grams = compute_ngrams(BOW + word + EOW, self.minn, self.maxn)
+            ngrams.extend(grams)
+            ngram_owner.extend([i] * len(grams))
+
+        ngram_rows = self.nwords + (fnv1a_batch(ngrams) % np.uint32(self.bucket)).astype(np.int64)
+        ngram_owner = np.asarray(ngram_owner, dtype=np.int64)
+
+        # in-vocabulary words contribute their own row first
+        known = np.nonzero(word_ids >= 0)[0]
+        rows = np.concatenate([word_ids[known], ngram_rows])
+        owner = np.concatenate([known, ngram_owner])
+
+        out = np.zeros((len(words), self.dim), dtype=np.float32)
+        if len(rows) == 0:
+            return out
+
+        # group rows by owner and average (fastText: sum * 1/n)
+        order = np.argsort(owner, kind="stable")
+        rows, owner = rows[order], owner[order]
+        gathered = np.asarray(self.matrix[rows], dtype=np.float32)
+        owners, starts, counts = np.unique(owner, return_index=True, return_counts=True)
+        sums = np.add.reduceat(gathered, starts, axis=0)
+        out[owners] = sums * (1.0 / counts).astype(np.float32)[:, None]
+        return out
+
+    def _word(self, i: int) -> str:
+        start, end = self.words_offsets[i], self.words_offsets[i + 1]
+        return self.words_blob[start:end].tobytes().decode("utf-8")
+
+    def _word_ids(self, words: List[str]) -> np.ndarray:
+        # vocabulary lookup via sorted word hashes, collisions are resolved by comparing bytes
+        hashes = fnv1a_batch(words)
+        lo = np.searchsorted(self.words_hash, hashes, side="left")
+        hi = np.searchsorted(self.words_hash, hashes, side="right")
+
+        ids = np.full(len(words), -1, dtype=np.int64)
+        for i, word in enumerate(words):
+            for pos in range(lo[i], hi[i]):
+                candidate = int(self.words_order[pos])
+                if self._word(candidate) == word:
+                    ids[i] = candidate
+                    break
+        return ids
+
+
+def compute_ngrams(word: str, minn: int, maxn: int) -> List[str]:
+    """
+    Character n-grams of a BOW/EOW wrapped word in fastText order
+    """
+    ngrams = []
+    length = len(word)
+    for i in range(length):
+        for n in range(1, maxn + 1):
+            if i + n > length:
+                break
+            if n >= minn and not (n == 1 and (i == 0 or i + n == length)):
+                ngrams.append(word[i:i + n])
+    return ngrams
+
+
+def fnv1a_batch(strings: List[str]) -> np.ndarray:
+    """
+    fastText's 32-bit FNV-1a hash (bytes sign-extended as int8) for many strings
+    Strings are grouped by UTF-8 byte length and hashed column by column.
+    """
+    encoded = [s.encode("utf-8") for s in strings]
+    hashes = np.empty(len(encoded), dtype=np.uint32)
+    if not encoded:
+        return hashes
+
+    lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+    for length in np.unique(lengths):
+        idx = np.nonzero(lengths == length)[0]
+        data = np.frombuffer(b"".join(encoded[i] for i in idx), dtype=np.int8).reshape(len(idx), length)
+        h = np.full(len(idx), FNV_OFFSET, dtype=np.uint32)
+        for j in range(length):
+            h ^= data[:, j].astype(np.uint32) # sign extension like uint32_t(int8_t(c))
+            h *= FNV_PRIME
+        hashes[idx] = h
+    return hashes
+
+
+def export_fasttext_model(ft_model, model_path: str, out_path: str, dtype: str = "float32"):
+    """
+    Export input matrix, vocabulary and subword parameters of a loaded
+    fastText model so that SubwordEmbedding can serve its word vectors
+    """
+    os.makedirs(out_path, exist_ok=True)
+    args = ft_model.f.getArgs()
+    words = ft_model.get_words()
+
+    # input matrix (words followed by n-gram buckets)
+    np.save(os.path.join(out_path, MATRIX_FILE), ft_model.get_input_matrix().astype(dtype, copy=False))
+
+    # vocabulary as one utf-8 blob with offsets
+    encoded = [w.encode("utf-8") for w in words]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    np.save(os.path.join(out_path, WORDS_BLOB_FILE), np.frombuffer(b"".join(encoded), dtype=np.uint8))
+    np.save(os.path.join(out_path, WORDS_OFFSETS_FILE), offsets)
+
+    # sorted word hashes for lookups
+    hashes = fnv1a_batch(words)
+    order = np.argsort(hashes, kind="stable")
+    np.save(os.path.join(out_path, WORDS_HASH_FILE), hashes[order])
+    np.save(os.path.join(out_path, WORDS_ORDER_FILE), order.astype(np.int32))
+
+    meta = {
+        "model_fingerprint": file_fingerprint(model_path),
+        "nwords": len(words),
+        "minn": args.minn,
+        "maxn": args.maxn,
+        "bucket": args.bucket,
+        "dim": ft_model.get_dimension(),
+        "dtype": dtype,
+    }
+    with open(os.path.join(out_path, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=4)
+
+    print(f"✅ Embeddings exported to {out_path}")
+    return meta
+
+
+def check_parity(ft_model, embedding: SubwordEmbedding, words: List[str]) -> float:
+    """
+    Return the max absolute difference between fastText and SubwordEmbedding vectors
+    """
+    expected = np.stack([ft_model.get_word_vector(w) for w in words])
+    actual = embedding.get_word_vectors(words)
+    return float(np.max(np.abs(expected - actual)))
+
+
+def load_embedding_model(model_path: str, export_path: str):
+    """
+    Return a SubwordEmbedding if an export exists (and matches model_path
+    when that file is present), otherwise the fastText model itself
+    """
+    if os.path.exists(os.path.join(export_path, META_FILE)):
+        embedding = SubwordEmbedding(export_path)
+        if not os.path.exists(model_path) or file_fingerprint(model_path) == embedding.model_fingerprint:
+            print(f"Loading exported embeddings from {export_path}")
+            return embedding
+        print(f"[WARNING] Export in {export_path} does not match {model_path}, loading fastText.")
+
+    import fasttext # optional, only needed without an export
+    print("Loading fastText model...")
+    return fasttext.load_model(model_path)
+
+
+def embedding_fingerprint(embedding_model, model_path: str) -> str:
+    # fingerprint of the model behind embedding_model (identical for fastText and its float32 export)
+    if isinstance(embedding_model, SubwordEmbedding):
+        return embedding_model.fingerprint
+    return file_fingerprint(model_path)
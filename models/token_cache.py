@@ -0,0 +1,138 @@
+import os
+import sqlite3
+from collections import OrderedDict
+from typing import Dict, List
+
+from utils.hashing import fingerprint, file_fingerprint
+from configs.paths import CACHE_PATH
+
+TOKEN_CACHE_PATH = f"{CACHE_PATH}token_ambiguity.sqlite"
+
+
+class TokenAmbiguityCache:
+    """
+    Persistent cache of raw token ambiguities A_raw(t)
+    Entries are keyed by (fingerprint, token) in a local SQLite file,
+    an in-process LRU sits in front of it. A changed fingerprint
+    (model, dictionary parameters, anchors) never hits stale entries.
+    """
+
+    def __init__(self, cache_fingerprint: str, path: str = TOKEN_CACHE_PATH, lru_size: int = 100000):
+        # cache_fingerprint: see token_cache_fingerprint()
+        # path: SQLite file holding the cache
+        # lru_size: max number of tokens kept in memory
+
+        self.fingerprint = cache_fingerprint
+        self.path = path
+        self.lru_size = lru_size
+        self.lru = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=60) # wait for concurrent writers
+        self.conn.execute("PRAGMA journal_mode = WAL;") # readers do not block the writer
+        self.conn.execute(
+            """ CREATE TABLE IF NOT EXISTS token_ambiguity (
+                    fingerprint TEXT NOT NULL,
+                    token TEXT NOT NULL,
+                    a_raw REAL NOT NULL,
+                    PRIMARY KEY (fingerprint, token)
+                ) WITHOUT ROWID;
+            """
+        )
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+        self.conn = None
+
+    def get_many(self, tokens: List[str]) -> Dict[str, float]:
+        """
+        Return {token: A_raw} for all cached tokens, missing tokens are left out
+        """
+        found = {}
+        missing = []
+
+        # in-process LRU first
+        for token in tokens:
+            if token in self.lru:
+                self.lru.move_to_end(token)
+                found[token] = self.lru[token]
+            else:
+                missing.append(token)
+
+        # SQLite second (chunked to stay below the variable limit)
+        for i in range(0, len(missing), 500):
+            chunk = missing[i:i + 500]
+            placeholders = ", ".join(["?"] * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT token, a_raw FROM token_ambiguity WHERE fingerprint = ? AND token IN ({placeholders});",
+                [self.fingerprint, *chunk]
+            ).fetchall()
+            for token, a_raw in rows:
+                found[token] = a_raw
+                self._remember(token, a_raw)
+
+        self.hits += len(found)
+        self.misses += len(tokens) - len(found)
+        return found
+
+    def put_many(self, values: Dict[str, float]):
+        """
+        Store {token: A_raw} persistently
+        """
+        if not values:
+            return
+
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO token_ambiguity (fingerprint, token, a_raw) VALUES (?, ?, ?);",
+            [(self.fingerprint, token, float(a_raw)) for token, a_raw in values.items()]
+        )
+        self.conn.commit()
+
+        for token, a_raw in values.items():
+            self._remember(token, float(a_raw))
+
+    def prune(self) -> int:
+        """
+        Delete entries of all other fingerprints, returns number of removed rows
+        """
+        cur = self.conn.execute("DELETE FROM token_ambiguity WHERE fingerprint != ?;", (self.fingerprint,))
+        self.conn.commit()
+        return cur.rowcount
+
+    def _remember(self, token: str, a_raw: float):
+        self.lru[token] = a_raw
+        self.lru.move_to_end(token)
+        if len(self.lru) > self.lru_size:
+            self.lru.popitem(last=False)
+
+
+def token_cache_fingerprint(
+    model_fingerprint: str,
+    max_words: int,
+    min_len: int,
+    alpha_only: bool,
+    anchor_path: str,
+    index_type: str = "flat",
+    index_params: dict = None
+) -> str:
+    # fingerprint of everything raw token ambiguity depends on
+    # approximate indexes may return other neighbors, so they are part of it
+    return fingerprint(
+        model_fingerprint,
+        max_words,
+        min_len,
+        alpha_only,
+        file_fingerprint(anchor_path),
+        index_type,
+        sorted((index_params or {}).items())
+    )
@@ -4,9 +4,14 @@ import argparse
 from tqdm import tqdm
 from dotenv import load_dotenv
 
-from models.prompt import Prompter
+from models.prompt import Prompter, run_name
+from models.demonstrations import DemonstrationIndex
 from models.schema_builder import SchemaBuilder
-from configs.paths import SPIDER_DEV_PATH, BIRD_DEV_PATH, KAGGLEDBQA_DEV_PATH, RESULTS_PATH
+from models.schema_linker import SchemaLinker
+from models.subword_embedding import load_embedding_model, embedding_fingerprint
+from utils.naming import tokenize_name
+from utils.dataset import load_dev_samples
+from configs.paths import RESULTS_PATH, EMBEDDING_ARTIFACT_PATH, DEMONSTRATION_ARTIFACT_PATH
 
 load_dotenv()
 
@@ -14,6 +19,7 @@ MODELS = {
     "gpt-5.2": {"provider": "openai", "model": "gpt-5.2"},
     "llama-3.3-70B": {"provider": "together", "model": "meta-llama/Llama-3.3-70B-Instruct-Turbo"},
 }
+EMBEDDING_MODEL_PATH = "cc.en.300.bin" # used for schema linking (--prune) and demonstration retrieval (--few_shot)
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
@@ -21,6 +27,10 @@ if __name__ == '__main__':
     parser.add_argument("--dataset", type=str, choices=["spider", "bird"], default="spider")
     parser.add_argument("--level", type=str, choices=["L0", "L1", "L2", "L3"], default="L0")
     parser.add_argument("--model", type=str, choices=["gpt-5.2", "llama-3.3-70B"], default="gpt-5.2")
+    parser.add_argument("--prune", action="store_true") # prompt with a question-specific pruned schema
+    parser.add_argument("--max_tables", type=int, default=5) # tables kept before foreign key closure
+    parser.add_argument("--max_columns", type=int, default=10) # non-key columns kept per table
+    parser.add_argument("--few_shot", type=int, default=0) # number of retrieved demonstrations (see build_demonstrations.py)
     args = parser.parse_args()
 
 
@@ -28,30 +38,37 @@ if __name__ == '__main__':
     LEVEL = args.level
     MODEL = args.model
 
-    # target dir
-    if LEVEL == "L0":
-        if DATASET == "spider": dev_path = SPIDER_DEV_PATH
-        elif DATASET == "bird": dev_path = BIRD_DEV_PATH
-        elif DATASET == "kaggledbqa": dev_path = KAGGLEDBQA_DEV_PATH
-        else: raise Exception("Invalid dataset selection.")
-    else:
-        dev_path = f"data/datasets/{DATASET}_{LEVEL}/dev.json"
-
-    # load questions
-    with open(dev_path, "r") as f: 
-        samples = json.load(f)
+    # load questions (original or anonymized dev set of the level)
+    samples = load_dev_samples(DATASET, LEVEL)
 
     schema_strings = {}
+    schema_objects = {}
+
+    embedding_model = None
+    if args.prune or args.few_shot:
+        embedding_model = load_embedding_model(EMBEDDING_MODEL_PATH, EMBEDDING_ARTIFACT_PATH)
+
+    # optional schema linking, name embeddings are computed once per database
+    linker = None
+    if args.prune:
+        linker = SchemaLinker(
+            embedding_model,
+            tokenize_name,
+            model_fingerprint=embedding_fingerprint(embedding_model, EMBEDDING_MODEL_PATH),
+            max_tables=args.max_tables,
+            max_columns=args.max_columns
+        )
 
     responses = []
+    run = run_name(DATASET, LEVEL, MODEL, pruned=args.prune, few_shot=args.few_shot)
 
     # json as main results file
-    json_path = f"{RESULTS_PATH}{DATASET}_{LEVEL}_{MODEL}_results.json"
+    json_path = f"{RESULTS_PATH}{run}_results.json"
     if os.path.exists(json_path):
         raise Exception("Responses already generated.")
 
     # jsonl as backup
-    jsonl_path = f"{RESULTS_PATH}{DATASET}_{LEVEL}_{MODEL}_results.jsonl"
+    jsonl_path = f"{RESULTS_PATH}{run}_results.jsonl"
     if os.path.exists(jsonl_path):
         with open(jsonl_path, "r", encoding="utf-8") as f:
             for line in f:
@@ -69,6 +86,14 @@ if __name__ == '__main__':
     start_index = len(responses)
     print(f"Starting generating responses at index {start_index}")
 
+    # retrieve demonstrations of all remaining questions in one search
+    demonstrations = [[] for _ in samples]
+    if args.few_shot:
+        demo_index = DemonstrationIndex.load(DEMONSTRATION_ARTIFACT_PATH)
+        demonstrations[start_index:] = demo_index.retrieve(
+            [sample["question"] for sample in samples[start_index:]], embedding_model, k=args.few_shot, level=LEVEL
+        )
+
     for i, sample in tqdm(enumerate(samples[start_index:], start=start_index)):
 
         db_id = sample["db_id"]
@@ -77,14 +102,24 @@ if __name__ == '__main__':
             sb = SchemaBuilder(dataset=DATASET, db_id=db_id, level=LEVEL)
             sb.load_schema_json(repopulate_attributes=True)
             schema_strings[db_id] = sb.generate_schema_string()
+            schema_objects[db_id] = sb.schema_object
+
+        schema_string = schema_strings[db_id]
+        if linker:
+            schema_string = linker.pruned_schema_string(schema_objects[db_id], sample["question"])
         
         p = Prompter(
-            provider=MODELS[MODEL]["provider"], model=MODELS[MODEL]["model"], schema_string=schema_strings[db_id]
+            provider=MODELS[MODEL]["provider"], model=MODELS[MODEL]["model"], schema_string=schema_string,
+            demonstrations=demonstrations[i]
         )
 
         # print(f"Generating response {i}")
         response = p.ask_question(question=sample["question"]) # returns llm response dictionary
 
+        # size of the schema string with and without pruning (prompt_tokens only covers the pruned prompt)
+        if linker:
+            response["schema_chars"] = {"full": len(schema_strings[db_id]), "pruned": len(schema_string)}
+
         # determine gold sql attribute
         if DATASET == "bird" and LEVEL == "L0":
             sql_gold_attr = "SQL"
@@ -106,6 +141,12 @@ if __name__ == '__main__':
     with open(json_path, "w", encoding="utf-8") as f:
         json.dump(responses, f, indent=4)
 
+    if linker:
+        schema_chars = [r["schema_chars"] for r in responses if "schema_chars" in r] # resumed runs may predate it
+        full = sum(c["full"] for c in schema_chars)
+        pruned = sum(c["pruned"] for c in schema_chars)
+        print(f"Schema linking kept {pruned} of {full} schema characters ({pruned / max(full, 1):.1%})")
+
     print(f"✅ Results of {DATASET} in level {LEVEL} saved to {json_path}")
 
 
@@ -0,0 +1,71 @@
+import argparse
+
+from models.faiss_index import EmbeddingIndex, load_or_build_index
+from models.sas import SchemaAmbiguityScorer
+from models.sas_service import SASBatcher, make_server, DEFAULT_HOST, DEFAULT_PORT
+from models.token_cache import TokenAmbiguityCache, token_cache_fingerprint
+from models.subword_embedding import load_embedding_model, embedding_fingerprint
+from utils.ambiguity import ANCHOR_PATH
+from configs.paths import INDEX_ARTIFACT_PATH, EMBEDDING_ARTIFACT_PATH
+from utils.naming import tokenize_name
+from utils.vocab import MAX_WORDS, MIN_LEN, ALPHA_ONLY
+
+"""
+
+    long-running local SAS scoring daemon (localhost HTTP)
+    loads model and index once and serves score_names, score_schema
+    and score_sqlite requests, use models.sas_service.SASClient to query it
+
+"""
+
+MODEL_PATH = "cc.en.300.bin"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--host", type=str, default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--index_path", type=str, default=None) # prebuilt (e.g. approximate or compressed) index artifacts
+    parser.add_argument("--max_batch_names", type=int, default=50000)
+    parser.add_argument("--max_wait_ms", type=float, default=5.0) # batching window
+    parser.add_argument("--no_cache", action="store_true")
+    args = parser.parse_args()
+
+    # load exported embeddings (see export_embeddings.py) or the fastText model
+    model = load_embedding_model(MODEL_PATH, EMBEDDING_ARTIFACT_PATH)
+    model_fingerprint = embedding_fingerprint(model, MODEL_PATH)
+
+    # load prebuilt dictionary and FAISS index (see build_index.py) or build them
+    if args.index_path:
+        index = EmbeddingIndex.load(args.index_path)
+    else:
+        index = load_or_build_index(
+            model,
+            model_fingerprint,
+            INDEX_ARTIFACT_PATH,
+            max_words=MAX_WORDS,
+            min_len=MIN_LEN,
+            alpha_only=ALPHA_ONLY
+        )
+
+    # persistent token ambiguity cache, opened in the scorer thread
+    cache_factory = None
+    if not args.no_cache:
+        cache_fingerprint = token_cache_fingerprint(
+            model_fingerprint, MAX_WORDS, MIN_LEN, ALPHA_ONLY, ANCHOR_PATH,
+            index.index_type, index.index_params
+        )
+        cache_factory = lambda: TokenAmbiguityCache(cache_fingerprint)
+
+    scorer = SchemaAmbiguityScorer(model, index, tokenize_name)
+    batcher = SASBatcher(scorer, cache_factory, max_batch_names=args.max_batch_names, max_wait_ms=args.max_wait_ms)
+
+    server = make_server(batcher, args.host, args.port)
+    print(f"✅ SAS server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
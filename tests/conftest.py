@@ -0,0 +1,5 @@
+import os
+import sys
+
+# tests import the modules of the repository root (like the scripts run from there)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,27 @@
+import pytest
+
+from benchmarks.copy_memory import build_database, measure_copy, cache_mb, SMALL_ROWS
+
+LARGE_ROWS = 200000
+ROW_BYTES = 500 # ~100 MB table, 20x the small one
+SLACK_MB = 32 # loading the large table into python at once grows the peak by > 100 MB
+PROFILE = "default" # small page cache, so the bound stays well below the table size
+
+
+@pytest.fixture(scope="module")
+def workdir(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("copy_memory"))
+    build_database(path, "copy_memory_small", SMALL_ROWS, ROW_BYTES)
+    build_database(path, "copy_memory_large", LARGE_ROWS, ROW_BYTES)
+    return path
+
+
+# peak RSS of copying the large table may only exceed the small one by the page cache of the profile
+@pytest.mark.parametrize("engine", [True, False], ids=["engine", "stream"])
+def test_copy_memory_is_bounded(workdir, engine):
+    small = measure_copy(workdir, "copy_memory_small", engine, 10000, PROFILE)
+    large = measure_copy(workdir, "copy_memory_large", engine, 10000, PROFILE)
+
+    assert small["rows"] == SMALL_ROWS
+    assert large["rows"] == LARGE_ROWS
+    assert large["peak_rss_mb"] - small["peak_rss_mb"] <= cache_mb(PROFILE) + SLACK_MB
@@ -0,0 +1,12 @@
+import pytest
+
+from benchmarks.import_time import measure_import, MODULES
+
+
+# heavy dependencies are loaded on first use, never when a module is imported
+@pytest.mark.parametrize("module", MODULES)
+def test_no_heavy_imports(module):
+    _, heavy, error = measure_import(module)
+    if error:
+        pytest.skip(f"{module} cannot be imported here ({error})")
+    assert heavy == []
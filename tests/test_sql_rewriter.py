@@ -0,0 +1,54 @@
+import pytest
+
+from benchmarks.sql_rewrite_check import normalize
+from models.schema_anonymizer import translate_sql_ast
+from models.sql_rewriter import SQLRewriter
+
+# old name (lowercase) -> new name, like SchemaAnonymizer.generate_mapping()
+MAPPING = {
+    "singer": "sngr",
+    "singer_id": "sngr_id",
+    "name": "pqm4_name",
+    "country": "singer", # new name equals another original name
+    "age": "Age", # case-only rename
+    "concert": "evt",
+    "concert_id": "evt_id",
+    "year": "yr",
+    "venue": "location name", # new name needs quoting
+    "stadium": "stadium",
+}
+
+QUERIES = [
+    "SELECT count(*) FROM singer",
+    "SELECT name, country, age FROM singer ORDER BY age DESC",
+    "SELECT T1.name FROM singer AS T1 JOIN concert AS T2 ON T1.singer_id = T2.singer_id WHERE T2.year = 2014",
+    "SELECT name FROM singer WHERE singer_id NOT IN (SELECT singer_id FROM concert)",
+    "SELECT country, count(*) FROM singer GROUP BY country HAVING count(*) > 1",
+    "SELECT avg(age), min(age), max(age) FROM singer WHERE country = 'France'",
+    "SELECT name FROM singer WHERE name LIKE '%singer%'",
+    "SELECT \"name\" FROM \"singer\" WHERE \"Age\" > 20",
+    "SELECT s.name AS singer FROM singer s ORDER BY singer",
+    "SELECT venue FROM concert WHERE year BETWEEN 2010 AND 2015 ORDER BY venue COLLATE NOCASE",
+    "SELECT DISTINCT T1.country FROM singer AS T1 JOIN concert AS T2 ON T1.singer_id = T2.singer_id",
+    "SELECT name FROM singer UNION SELECT venue FROM concert",
+    "SELECT concert_id, (SELECT count(*) FROM singer WHERE singer.singer_id = concert.singer_id) FROM concert",
+    "SELECT year, count(*) AS n FROM concert GROUP BY year ORDER BY n DESC LIMIT 1",
+    "SELECT name FROM stadium WHERE name = 'concert'",
+    "SELECT max(year) FROM concert WHERE concert_id IN (1, 2, 3)",
+]
+
+
+# the token-stream rewriter must produce the same query as the AST rewriting
+@pytest.mark.parametrize("sql", QUERIES)
+def test_rewriter_matches_ast(sql):
+    rewriter = SQLRewriter(MAPPING)
+    assert normalize(rewriter.rewrite(sql)) == normalize(translate_sql_ast(sql, MAPPING))
+
+
+# the sample covers both the token path and the AST fallback
+def test_sample_covers_both_paths():
+    rewriter = SQLRewriter(MAPPING)
+    for sql in QUERIES:
+        rewriter.rewrite(sql)
+    assert rewriter.token_rewrites > 0
+    assert rewriter.fallbacks > 0
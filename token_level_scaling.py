@@ -1,19 +1,28 @@
 import json
+import argparse
 import numpy as np
 import random
-import fasttext
+import multiprocessing as mp
 
-from models.faiss_index import EmbeddingIndex
-from utils.ambiguity import token_ambiguity
-from utils.vocab import build_dictionary_from_fasttext
+from models.faiss_index import load_or_build_index
+from models.subword_embedding import load_embedding_model, embedding_fingerprint
+from utils.ambiguity import token_ambiguity_raw_batch
+from utils.vocab import MAX_WORDS, MIN_LEN, ALPHA_ONLY
+from configs.paths import INDEX_ARTIFACT_PATH, EMBEDDING_ARTIFACT_PATH
 
 
 SEED = 42
 N_CLEAR = 5000 # number of real English tokens to sample
 N_NOISE = 5000 # number of random noise tokens
+N_BOOTSTRAP = 1000 # bootstrap resamples for confidence intervals
+CONFIDENCE = 0.95
 MODEL_PATH = "cc.en.300.bin"
 OUTPUT_PATH = "configs/token_ambiguity_anchors.json"
 
+# model and index of the current process (inherited by forked workers)
+_model = None
+_index = None
+
 # generate random noise token
 def generate_random_token(min_len=5, max_len=12):
     letters = "abcdefghijklmnopqrstuvwxyz0123456789"
@@ -21,55 +30,89 @@ def generate_random_token(min_len=5, max_len=12):
     return "".join(random.choice(letters) for _ in range(L))
 
 
-def main():
+# sample clear dictionary words and random noise tokens
+def sample_calibration_tokens(dict_words, seed=SEED, n_clear=N_CLEAR, n_noise=N_NOISE):
 
     # seeding for reproducibility
-    random.seed(SEED)
-    np.random.seed(SEED)
-
-    # load fastText model
-    print("Loading fastText model...")
-    model = fasttext.load_model(MODEL_PATH)
-
-    # build dictionary
-    dict_words, dict_vectors = build_dictionary_from_fasttext(
-        model,
-        max_words=200000,
-        min_len=3,
-        alpha_only=True
+    random.seed(seed)
+    np.random.seed(seed)
+
+    clear_words = random.sample(dict_words, n_clear)
+    noise_words = [generate_random_token() for _ in range(n_noise)]
+    return clear_words, noise_words
+
+
+# raw scores of the clear and noise sample of one seed (one FAISS search per group)
+# anchors are the means of raw scores: scaled scores depend on the anchors themselves,
+# and clear words are searched too instead of short-circuiting as exact dictionary hits
+def score_seed(seed):
+    clear_words, noise_words = sample_calibration_tokens(_index.dict_words, seed=seed)
+    A_clear = token_ambiguity_raw_batch(clear_words, _model, _index, exact_matches=False)
+    A_noise = token_ambiguity_raw_batch(noise_words, _model, _index, exact_matches=False)
+    return seed, A_clear, A_noise
+
+
+# percentile bootstrap confidence interval of the mean
+def bootstrap_ci(values, n_boot=N_BOOTSTRAP, confidence=CONFIDENCE, seed=SEED):
+    values = np.asarray(values, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+
+    means = np.empty(n_boot, dtype=np.float64)
+    for b in range(n_boot):
+        means[b] = values[rng.integers(0, len(values), len(values))].mean()
+
+    alpha = (1.0 - confidence) / 2.0
+    return [float(np.quantile(means, alpha)), float(np.quantile(means, 1.0 - alpha))]
+
+
+def main():
+    global _model, _index
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seeds", type=int, default=1) # number of samples, seeds SEED, SEED+1, ...
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--bootstrap", type=int, default=N_BOOTSTRAP)
+    parser.add_argument("--confidence", type=float, default=CONFIDENCE)
+    args = parser.parse_args()
+
+    # load exported embeddings (see export_embeddings.py) or the fastText model
+    _model = load_embedding_model(MODEL_PATH, EMBEDDING_ARTIFACT_PATH)
+
+    # load prebuilt dictionary and FAISS index (see build_index.py) or build them
+    _index = load_or_build_index(
+        _model,
+        embedding_fingerprint(_model, MODEL_PATH),
+        INDEX_ARTIFACT_PATH,
+        max_words=MAX_WORDS,
+        min_len=MIN_LEN,
+        alpha_only=ALPHA_ONLY
     )
 
-    # build FAISS index
-    index = EmbeddingIndex(dict_words, dict_vectors)
+    # score clear and valid English words as well as noise tokens for every seed
+    seeds = [SEED + i for i in range(args.seeds)]
+    print(f"Scoring {N_CLEAR} clear and {N_NOISE} noise tokens for {len(seeds)} seed(s)...")
 
-    # sample clear and valid English words
-    clear_words = random.sample(dict_words, N_CLEAR)
+    if args.workers > 1 and len(seeds) > 1 and "fork" in mp.get_all_start_methods():
+        # forked workers share model and index copy-on-write
+        with mp.get_context("fork").Pool(min(args.workers, len(seeds))) as pool:
+            results = pool.map(score_seed, seeds)
+    else:
+        results = [score_seed(seed) for seed in seeds]
 
-    A_clear = []
-    for w in clear_words:
-        A = token_ambiguity(w, model, index)
-        A_clear.append(A)
+    A_clear = np.concatenate([r[1] for r in results])
+    A_noise = np.concatenate([r[2] for r in results])
 
     A_clear_mean = float(np.mean(A_clear))
     A_clear_std = float(np.std(A_clear))
+    A_clear_ci = bootstrap_ci(A_clear, args.bootstrap, args.confidence)
 
-    print(f"Mean A(clear) = {A_clear_mean:.6f} (std = {A_clear_std:.6f})")
-
-    
-    
-    # generate noise tokens
-    print(f"Generating {N_NOISE} random noise tokens...")
-    noise_words = [generate_random_token() for _ in range(N_NOISE)]
-
-    A_noise = []
-    for w in noise_words:
-        A = token_ambiguity(w, model, index)
-        A_noise.append(A)
+    print(f"Mean A(clear) = {A_clear_mean:.6f} (std = {A_clear_std:.6f}, CI = [{A_clear_ci[0]:.6f}, {A_clear_ci[1]:.6f}])")
 
     A_noise_mean = float(np.mean(A_noise))
     A_noise_std = float(np.std(A_noise))
+    A_noise_ci = bootstrap_ci(A_noise, args.bootstrap, args.confidence)
 
-    print(f"Mean A(noise) = {A_noise_mean:.6f} (std = {A_noise_std:.6f})")
+    print(f"Mean A(noise) = {A_noise_mean:.6f} (std = {A_noise_std:.6f}, CI = [{A_noise_ci[0]:.6f}, {A_noise_ci[1]:.6f}])")
 
     # store results
     anchors = {
@@ -80,6 +123,13 @@ def main():
         "A_clear_std": A_clear_std,
         "A_noise_mean": A_noise_mean,
         "A_noise_std": A_noise_std,
+        "A_clear_ci": A_clear_ci,
+        "A_noise_ci": A_noise_ci,
+        "confidence": args.confidence,
+        "n_bootstrap": args.bootstrap,
+        "seeds": seeds,
+        "A_clear_seed_means": [float(np.mean(r[1])) for r in results],
+        "A_noise_seed_means": [float(np.mean(r[2])) for r in results],
     }
 
     with open(OUTPUT_PATH, "w") as f:
@@ -90,4 +140,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,16 +1,32 @@
 import json
 import numpy as np
-from typing import List, Callable
+from functools import lru_cache
+from typing import List, Callable, Tuple
+
+from utils.vocab import get_word_vectors
 
 EPSILON = 0.01 # lower bound for product of token scores to fix the 0 problem
 ANCHOR_PATH = "configs/token_ambiguity_anchors.json"
-with open(ANCHOR_PATH, "r") as f:
-    anchors = json.load(f)
-
-A_CLEAR = anchors["A_clear_mean"] # ~ 0.0
-A_NOISE = anchors["A_noise_mean"] # ~ 0.30
 
-def token_ambiguity_raw(token: str, embedding_model, faiss_index) -> float:
+@lru_cache(maxsize=None)
+def get_anchors(anchor_path: str = ANCHOR_PATH) -> Tuple[float, float]:
+    """
+    Return calibrated anchors (A_clear, A_noise), read on first use
+    A_clear ~ 0.0, A_noise ~ 0.30 (see token_level_scaling.py)
+    """
+    with open(anchor_path, "r") as f:
+        anchors = json.load(f)
+    return anchors["A_clear_mean"], anchors["A_noise_mean"]
+
+def __getattr__(name: str):
+    # keep module attributes A_CLEAR / A_NOISE without reading the anchors at import time
+    if name == "A_CLEAR":
+        return get_anchors()[0]
+    if name == "A_NOISE":
+        return get_anchors()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def token_ambiguity_raw(token: str, embedding_model, faiss_index, cache=None) -> float:
     """
     Compute raw ambiguity A_raw(t) = (1 - sim_max) / 2,
     without scaling or epsilon.
@@ -21,6 +37,12 @@ def token_ambiguity_raw(token: str, embedding_model, faiss_index) -> float:
     if token.isnumeric():
         return 1.0
 
+    # persistent cache
+    if cache is not None:
+        cached = cache.get_many([token])
+        if token in cached:
+            return cached[token]
+
     # get embedding
     vec = embedding_model.get_word_vector(token)
 
@@ -28,20 +50,66 @@ def token_ambiguity_raw(token: str, embedding_model, faiss_index) -> float:
     nearest_word, sim = faiss_index.nearest_word(vec)
 
     # convert similarity in [-1,1] to ambiguity [0,1]
-    A_raw = min((1.0 - sim), 1.0)
-    return float(max(0.0, A_raw))
+    A_raw = float(max(0.0, min((1.0 - sim), 1.0)))
 
+    if cache is not None:
+        cache.put_many({token: A_raw})
+    return A_raw
 
-def token_ambiguity(token: str, embedding_model, faiss_index) -> float:
-    """
-    Normalized token ambiguity:
-
-        A_scaled = (A_raw - A_clear) / (A_noise - A_clear)
-        A_scaled ∈ [0,1]
-        A_final  = max(A_scaled, EPSILON)
 
+def token_ambiguity_raw_batch(tokens: List[str], embedding_model, faiss_index, cache=None, exact_matches: bool = True) -> np.ndarray:
+    """
+    Vectorized token_ambiguity_raw for a list of (stripped) tokens.
+    Numeric tokens and exact dictionary hits are resolved without a search,
+    cached tokens are taken from the cache and all remaining tokens are
+    embedded as one matrix and looked up in a single FAISS search.
+    With exact_matches=False dictionary words are searched as well
+    (calibration measures their actual nearest-neighbor distance).
     """
-    A_raw = token_ambiguity_raw(token, embedding_model, faiss_index)
+    A_raw = np.zeros(len(tokens), dtype=np.float64)
+
+    query_pos = []
+    query_tokens = []
+    for i, token in enumerate(tokens):
+        if token.isnumeric():
+            A_raw[i] = 1.0 # purely numeric tokens carry no meaning
+        elif exact_matches and faiss_index.has_word(token):
+            A_raw[i] = 0.0 # nearest word is the token itself (sim = 1)
+        else:
+            query_pos.append(i)
+            query_tokens.append(token)
+
+    # persistent cache
+    if cache is not None and query_tokens:
+        cached = cache.get_many(query_tokens)
+        missing_pos = []
+        missing_tokens = []
+        for i, token in zip(query_pos, query_tokens):
+            if token in cached:
+                A_raw[i] = cached[token]
+            else:
+                missing_pos.append(i)
+                missing_tokens.append(token)
+        query_pos, query_tokens = missing_pos, missing_tokens
+
+    if query_tokens:
+        vecs = get_word_vectors(embedding_model, query_tokens)
+        distances, _ = faiss_index.nearest_neighbor(vecs, k=1)
+        sims = distances[:, 0].astype(np.float64)
+        A_raw[query_pos] = np.clip(1.0 - sims, 0.0, 1.0)
+
+        if cache is not None:
+            cache.put_many(dict(zip(query_tokens, A_raw[query_pos].tolist())))
+
+    return A_raw
+
+
+def scale_ambiguity(A_raw):
+    """
+    Linear anchor scaling, clipping and epsilon floor.
+    Works on floats and numpy arrays alike.
+    """
+    A_CLEAR, A_NOISE = get_anchors()
 
     # avoid division-by-zero
     if A_NOISE == A_CLEAR:
@@ -50,19 +118,29 @@ def token_ambiguity(token: str, embedding_model, faiss_index) -> float:
         # linear scaling
         A_scaled = (A_raw - A_CLEAR) / (A_NOISE - A_CLEAR)
 
-    # to [0,1]
-    A_scaled = float(max(0.0, min(1.0, A_scaled)))
-    
-    # epsilon floor
-    A_final = max(A_scaled, EPSILON)
-    return A_final
+    # to [0,1] and epsilon floor
+    return np.maximum(np.clip(A_scaled, 0.0, 1.0), EPSILON)
+
+
+def token_ambiguity(token: str, embedding_model, faiss_index, cache=None) -> float:
+    """
+    Normalized token ambiguity:
+
+        A_scaled = (A_raw - A_clear) / (A_noise - A_clear)
+        A_scaled ∈ [0,1]
+        A_final  = max(A_scaled, EPSILON)
+
+    """
+    A_raw = token_ambiguity_raw(token, embedding_model, faiss_index, cache)
+    return float(scale_ambiguity(A_raw))
 
 
 def name_sas(
     name: str,
     tokenizer: Callable[[str], List[str]],
     embedding_model,
-    faiss_index
+    faiss_index,
+    cache=None
 ) -> float:
     """
     Compute SAS(name) = product of token-level ambiguities.
@@ -71,10 +149,49 @@ def name_sas(
     if not tokens:
         return 1.0  # empty name = max ambiguity (rare case)
 
-    A_vals = [token_ambiguity(t, embedding_model, faiss_index) for t in tokens]
+    A_vals = [token_ambiguity(t, embedding_model, faiss_index, cache) for t in tokens]
 
     # Product of ambiguities
     sas_value = float(np.prod(A_vals))
 
     # Safety bound
     return sas_value
+
+
+def name_sas_batch(
+    names: List[str],
+    tokenizer: Callable[[str], List[str]],
+    embedding_model,
+    faiss_index,
+    cache=None
+) -> np.ndarray:
+    """
+    Compute SAS(name) for many names at once.
+    Tokens are deduplicated across all names, scored in one batch and
+    the per-name products are taken as exp(sum(log A)).
+    """
+    token_ids = {} # unique token -> position
+    name_idx = [] # name position of every token occurrence
+    tok_idx = [] # unique token position of every token occurrence
+
+    for i, name in enumerate(names):
+        for token in tokenizer(name):
+            token = token.strip()
+            if token not in token_ids:
+                token_ids[token] = len(token_ids)
+            name_idx.append(i)
+            tok_idx.append(token_ids[token])
+
+    if not token_ids:
+        return np.ones(len(names), dtype=np.float64)
+
+    A_raw = token_ambiguity_raw_batch(list(token_ids), embedding_model, faiss_index, cache)
+    log_A = np.log(scale_ambiguity(A_raw))
+
+    # sum of log ambiguities per name, names without tokens stay at log(1) = 0
+    log_sas = np.bincount(
+        np.asarray(name_idx, dtype=np.int64),
+        weights=log_A[np.asarray(tok_idx, dtype=np.int64)],
+        minlength=len(names)
+    )
+    return np.exp(log_sas)
@@ -0,0 +1,41 @@
+import os
+import json
+from typing import Dict, List, Any
+
+from configs.paths import SPIDER_DEV_PATH, BIRD_DEV_PATH, KAGGLEDBQA_DEV_PATH
+
+DEV_PATHS = {"spider": SPIDER_DEV_PATH, "bird": BIRD_DEV_PATH, "kaggledbqa": KAGGLEDBQA_DEV_PATH}
+
+# parsed dev sets per path, reused by every caller of the process (and by forked workers)
+_dev_sets = {}
+
+# dev file of a dataset, anonymized levels are stored by anonymize_schemas.py
+def dev_path(dataset: str, level: str = "L0") -> str:
+    if dataset not in DEV_PATHS:
+        raise ValueError(f"Unknown dataset: {dataset}")
+    if level == "L0":
+        return DEV_PATHS[dataset]
+    return f"data/datasets/{dataset}_{level}/dev.json"
+
+# samples of a dev file in file order, parsed once per process
+# reparsed only if the file changed on disk (e.g. rewritten by anonymize_schemas.py)
+def load_dev_samples(dataset: str, level: str = "L0") -> List[Dict[str, Any]]:
+    return _load_dev_set(dev_path(dataset, level))[0]
+
+# db_id -> samples of that database (in file order), built once per dev file
+def dev_samples_by_db(dataset: str, level: str = "L0") -> Dict[str, List[Dict[str, Any]]]:
+    return _load_dev_set(dev_path(dataset, level))[1]
+
+def _load_dev_set(path: str):
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _dev_sets.get(path)
+    if cached is None or cached[0] != key:
+        with open(path, "r") as f:
+            samples = json.load(f)
+        samples_by_db = {}
+        for sample in samples:
+            samples_by_db.setdefault(sample["db_id"], []).append(sample)
+        cached = (key, samples, samples_by_db)
+        _dev_sets[path] = cached
+    return cached[1], cached[2]
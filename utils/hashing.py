@@ -1,5 +1,11 @@
+import os
+import json
 import hashlib
 
+from configs.paths import CACHE_PATH
+
+FILE_HASHES_PATH = f"{CACHE_PATH}file_hashes.json"
+
 
 def deterministic_float(*values) -> float:
     # deterministically map a tuple of values to a float in [0, 1)
@@ -7,4 +13,60 @@ def deterministic_float(*values) -> float:
 
     text = "::".join(str(v) for v in values)
     h = hashlib.sha256(text.encode("utf-8")).hexdigest()    
-    return int(h[:8], 16) / 2**32 # take first 8 hex chars -> 32 bits -> int -> [0,1)
\ No newline at end of file
+    return int(h[:8], 16) / 2**32 # take first 8 hex chars -> 32 bits -> int -> [0,1)
+
+
+def fingerprint(*values) -> str:
+    # stable hex digest of a tuple of values (e.g. configuration parameters)
+
+    text = "::".join(str(v) for v in values)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def file_fingerprint(path: str, chunk_size: int = 1 << 20) -> str:
+    # sha256 of the whole file content, computed once per (path, mtime_ns, size)
+    # digests of (possibly multi-GB) files are kept in CACHE_PATH, later runs only stat the file
+
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    state = [stat.st_mtime_ns, stat.st_size]
+
+    hashes = _load_file_hashes()
+    cached = hashes.get(key)
+    if cached is not None and cached[:2] == state:
+        return cached[2]
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+
+    hashes[key] = state + [digest]
+    _save_file_hashes(hashes)
+    return digest
+
+
+# digests of file_fingerprint per absolute path, read once per process
+_file_hashes = None
+
+def _load_file_hashes() -> dict:
+    global _file_hashes
+    if _file_hashes is None:
+        try:
+            with open(FILE_HASHES_PATH, "r", encoding="utf-8") as f:
+                _file_hashes = json.load(f)
+        except (OSError, ValueError):
+            _file_hashes = {}
+    return _file_hashes
+
+def _save_file_hashes(hashes: dict):
+    # written to a temporary file first, concurrent runs never read a partial file
+    try:
+        os.makedirs(os.path.dirname(FILE_HASHES_PATH), exist_ok=True)
+        tmp_path = f"{FILE_HASHES_PATH}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(hashes, f, indent=4)
+        os.replace(tmp_path, FILE_HASHES_PATH)
+    except OSError:
+        pass # the digest is recomputed next time
@@ -197,6 +197,10 @@ def split_camel_and_underscores(name: str) -> List[str]:
             tokens.append(m.group(0))
     return tokens
 
+def tokenize_name(name: str) -> List[str]:
+    """Tokenizer of SAS scoring and schema linking: split name, lowercased like the fastText vocabulary."""
+    return [token.lower() for token in split_camel_and_underscores(name)]
+
 def infer_case_pattern(name: str) -> str:
     """Get the current pattern of name."""
     if "_" in name:
@@ -1,8 +1,14 @@
+import time
+import queue
 import sqlite3
-from func_timeout import func_timeout, FunctionTimedOut
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any
+
+VERIFY_MODES = ["full", "compile"]
 
 # testing samples
 def verify_sample(sql: str, db_path: str):
+    from func_timeout import func_timeout, FunctionTimedOut # loaded on first use
 
     def run_query():
         conn = sqlite3.connect(db_path)
@@ -24,3 +30,85 @@ def verify_sample(sql: str, db_path: str):
         print(e)
         print("------------------------------------")
         return False
+
+# EXPLAIN QUERY PLAN details of a query (None if it cannot be planned)
+def query_plan(sql: str, db_path: str):
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+
+# verify the queries of one database, returns the failures (sorted by index)
+# "compile" prepares every query via EXPLAIN without running it (schema and syntax errors),
+# "full" executes it and fetches the first row, a progress handler interrupts queries after timeout seconds
+# workers threads take the next pending query on their own read-only connection (sqlite releases the GIL while running)
+def verify_queries(sqls: List[str], db_path: str, mode: str = "full", timeout: float = 30, workers: int = 1) -> List[Dict[str, Any]]:
+    if mode not in VERIFY_MODES:
+        raise ValueError(f"Unknown verification mode: {mode}")
+
+    pending = queue.Queue()
+    for i, sql in enumerate(sqls):
+        pending.put((i, sql))
+
+    workers = max(1, min(workers, len(sqls)))
+    if workers == 1:
+        failures = _verify_pending(pending, db_path, mode, timeout)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = [pool.submit(_verify_pending, pending, db_path, mode, timeout) for _ in range(workers)]
+            failures = [failure for result in results for failure in result.result()]
+    return sorted(failures, key=lambda failure: failure["index"])
+
+# verify queries from pending until it is empty, on one read-only connection
+def _verify_pending(pending: queue.Queue, db_path: str, mode: str, timeout: float) -> List[Dict[str, Any]]:
+    def next_query():
+        try:
+            return pending.get_nowait()
+        except queue.Empty:
+            return None
+
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    except sqlite3.Error as e:
+        return [
+            {"index": i, "query": sql, "error_type": "connection", "error": str(e)}
+            for i, sql in iter(next_query, None)
+        ]
+
+    deadline = 0.0
+    def interrupt():
+        return time.monotonic() > deadline # non-zero aborts the running statement
+    conn.set_progress_handler(interrupt, 10000) # checked every 10k virtual machine instructions
+
+    failures = []
+    try:
+        for i, sql in iter(next_query, None):
+            deadline = time.monotonic() + timeout
+            try:
+                cur = conn.execute(f"EXPLAIN {sql}" if mode == "compile" else sql)
+                if mode == "full":
+                    cur.fetchone()
+                cur.close()
+            except Exception as e:
+                timed_out = isinstance(e, sqlite3.OperationalError) and time.monotonic() > deadline
+                failures.append({
+                    "index": i,
+                    "query": sql,
+                    "error_type": "timeout" if timed_out else verification_error_type(str(e)),
+                    "error": str(e)
+                })
+    finally:
+        conn.close()
+    return failures
+
+# category of a failed verification from its SQLite error message
+def verification_error_type(message: str) -> str:
+    message = message.lower()
+    if "syntax error" in message or "incomplete input" in message or "unrecognized token" in message or "one statement" in message:
+        return "syntax"
+    if "no such" in message or "ambiguous column" in message:
+        return "schema"
+    return "execution"
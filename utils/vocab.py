@@ -1,11 +1,16 @@
 import numpy as np
 
+# dictionary V of SAS scoring, shared by all scripts (part of the cache and artifact fingerprints)
+MAX_WORDS = 200000 # limit vocabulary
+MIN_LEN = 3 # ignore too-short tokens
+ALPHA_ONLY = True # keep only alphabetic words
+
 # builds a dictionary V from the fastText vocabulary
 def build_dictionary_from_fasttext(
     ft_model,
-    max_words: int = 200000, # limit vocabulary
-    min_len: int = 3, # ignore too-short tokens
-    alpha_only: bool = True # keep only alphabetic words
+    max_words: int = MAX_WORDS,
+    min_len: int = MIN_LEN,
+    alpha_only: bool = ALPHA_ONLY
 ):
     # returns:
     # - dict_words: list of strings
@@ -17,20 +22,21 @@ def build_dictionary_from_fasttext(
     if max_words is not None:
         vocab = vocab[:max_words]
 
-    dict_words = []
-    dict_vectors = []
-
-    for word in vocab:
-        if alpha_only and not word.isalpha():
-            continue
-        if len(word) < min_len:
-            continue
-
-        vector = ft_model.get_word_vector(word)
-        dict_words.append(word)
-        dict_vectors.append(vector)
-
-    dict_vectors = np.array(dict_vectors, dtype=np.float32)
+    dict_words = [
+        word for word in vocab
+        if (word.isalpha() or not alpha_only) and len(word) >= min_len
+    ]
+    dict_vectors = get_word_vectors(ft_model, dict_words)
 
     print(f"Dictionary built: {len(dict_words)} words, shape = {dict_vectors.shape}")
     return dict_words, dict_vectors
+
+# embeds a list of tokens as one (N, D) float32 matrix
+def get_word_vectors(ft_model, words):
+    if hasattr(ft_model, "get_word_vectors"): # batched provider (e.g. SubwordEmbedding)
+        return ft_model.get_word_vectors(list(words))
+
+    vectors = np.empty((len(words), ft_model.get_dimension()), dtype=np.float32)
+    for i, word in enumerate(words):
+        vectors[i] = ft_model.get_word_vector(word)
+    return vectors